@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Synthetic corpus generator for build benchmarks.
+
+Creates a self-contained site tree in a directory: posts (TeX stub, metafile,
+converted index.html and content.md), publication metafiles, and large
+talks, notes and reading-list files. Tags follow a Zipf distribution, so a
+few tags are on most posts and a long tail is on one or two, like a real blog.
+The same seed always produces the same corpus.
+"""
+import argparse
+import json
+import random
+import shutil
+from pathlib import Path
+from typing import Dict
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Files copied from the real site so the generator finds its configuration
+SITE_FILES = ["site.meta.json", "about.md"]
+
+TAG_POOL_SIZE = 200
+TAG_SKEW = 1.2
+WORDS = """
+type theory proof lambda calculus category functor monad sheaf topos logic
+linear session process coinduction bisimulation semantics operational
+denotational algebra ring group module homotopy equivalence induction
+recursion fixpoint lattice domain compiler parser verification model checking
+rocq coq agda lean formalisation theorem lemma definition example structure
+""".split()
+STATUSES = ["completed", "in-progress", "planned", "reference"]
+
+
+def corpus_sizes(scale: int) -> Dict[str, int]:
+    """Default item counts for a corpus of `scale` posts."""
+    return {
+        "posts": scale,
+        "publications": max(scale // 10, 1),
+        "talks": max(scale // 10, 1),
+        "notes": max(scale // 10, 1),
+        "reading_list": max(scale // 5, 1),
+    }
+
+
+def _tag_weights():
+    """Zipf weights for the tag pool."""
+    return [1 / (rank ** TAG_SKEW) for rank in range(1, TAG_POOL_SIZE + 1)]
+
+
+def _sentence(rng: random.Random, length: int) -> str:
+    """A run of vocabulary words."""
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def _title(rng: random.Random) -> str:
+    """A short title-cased phrase."""
+    return _sentence(rng, rng.randint(3, 7)).title()
+
+
+def write_posts(root: Path, rng: random.Random, count: int) -> None:
+    """Write post sources plus the converted HTML and Markdown build_posts would produce."""
+    posts_dir = root / "posts"
+    posts_dir.mkdir(parents=True, exist_ok=True)
+    tags = [f"tag-{rank}" for rank in range(1, TAG_POOL_SIZE + 1)]
+    weights = _tag_weights()
+    for i in range(count):
+        slug = f"post-{i:05d}"
+        date = f"{2015 + i % 10}-{1 + i % 12:02d}-{1 + i % 28:02d}"
+        title = _title(rng)
+        body = "\n\n".join(_sentence(rng, rng.randint(40, 120)) for _ in range(rng.randint(2, 6)))
+        post_tags = sorted(set(rng.choices(tags, weights, k=rng.randint(1, 4))))
+
+        (posts_dir / f"{date}-{slug}.tex").write_text(
+            f"\\documentclass{{article}}\n\\begin{{document}}\n{body}\n\\end{{document}}\n", encoding="utf-8")
+        (posts_dir / f"{slug}.meta.json").write_text(json.dumps({
+            "title": title,
+            "tags": post_tags,
+            "abstract": _sentence(rng, rng.randint(15, 40)),
+        }), encoding="utf-8")
+        out_dir = posts_dir / slug
+        out_dir.mkdir(exist_ok=True)
+        (out_dir / "content.md").write_text(f"# {title}\n\n{body}\n", encoding="utf-8")
+        (out_dir / "index.html").write_text(
+            f"<html><head><title>{title}</title></head><body><p>{body}</p></body></html>\n", encoding="utf-8")
+
+
+def write_publications(root: Path, rng: random.Random, count: int, talks: int) -> None:
+    """Write one metafile per publication plus a single large talks file."""
+    data_dir = root / "publications" / "data"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(count):
+        (data_dir / f"pub-{i:05d}.meta.json").write_text(json.dumps({
+            "title": _title(rng),
+            "authors": [_sentence(rng, 2).title() for _ in range(rng.randint(1, 5))],
+            "conference": _title(rng),
+            "year": str(2000 + i % 26),
+            "abstract": _sentence(rng, rng.randint(60, 200)),
+            "venue": _sentence(rng, 1).upper(),
+            "doi": f"https://doi.org/10.0000/{i}",
+        }), encoding="utf-8")
+    (data_dir / "talks.meta.json").write_text(json.dumps({"talks": [{
+        "title": _title(rng),
+        "type": "Invited Talk",
+        "venue": _title(rng),
+        "location": "Oxford, UK",
+        "date": f"{2015 + i % 10}-{1 + i % 12:02d}-{1 + i % 28:02d}",
+        "year": str(2015 + i % 10),
+        "slides": "",
+        "video": "",
+        "abstract": _sentence(rng, rng.randint(20, 60)),
+        "coauthors": [],
+    } for i in range(talks)]}), encoding="utf-8")
+
+
+def write_notes(root: Path, rng: random.Random, count: int) -> None:
+    """Write a notes.meta.json with `count` entries."""
+    (root / "notes.meta.json").write_text(json.dumps({"notes": [{
+        "title": _title(rng),
+        "slug": f"note-{i:05d}",
+        "description": _sentence(rng, rng.randint(10, 30)),
+        "pdf_file": "notes.pdf",
+        "category": rng.choice(["mathematics", "computer-science"]),
+    } for i in range(count)]}), encoding="utf-8")
+
+
+def write_reading_list(root: Path, rng: random.Random, count: int) -> None:
+    """Write a reading-list.meta.json with `count` entries."""
+    (root / "reading-list.meta.json").write_text(json.dumps({"reading_list": [{
+        "title": _title(rng),
+        "author": _sentence(rng, 2).title(),
+        "year": str(1970 + i % 55),
+        "type": rng.choice(["Book", "Paper"]),
+        "status": rng.choice(STATUSES),
+        "description": _sentence(rng, rng.randint(10, 40)),
+    } for i in range(count)]}), encoding="utf-8")
+
+
+def generate_corpus(root: Path, scale: int, seed: int = 0) -> Dict[str, int]:
+    """Create a synthetic site tree under root and return its item counts."""
+    sizes = corpus_sizes(scale)
+    rng = random.Random(seed)
+    root.mkdir(parents=True, exist_ok=True)
+    for name in SITE_FILES:
+        shutil.copy(REPO_ROOT / name, root / name)
+    shutil.copytree(REPO_ROOT / "css", root / "css", dirs_exist_ok=True)
+    write_posts(root, rng, sizes["posts"])
+    write_publications(root, rng, sizes["publications"], sizes["talks"])
+    write_notes(root, rng, sizes["notes"])
+    write_reading_list(root, rng, sizes["reading_list"])
+    return sizes
+
+
+def main(argv=None):
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Generate a synthetic site corpus.")
+    parser.add_argument("directory", type=Path, help="directory to create the corpus in")
+    parser.add_argument("--scale", type=int, default=1000, help="number of posts (default: 1000)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: 0)")
+    args = parser.parse_args(argv)
+
+    sizes = generate_corpus(args.directory, args.scale, args.seed)
+    print(f"Generated corpus in {args.directory}: " + ", ".join(f"{n} {k}" for k, n in sizes.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Build benchmarks on synthetic corpora.
+
+For each scale a corpus is generated (see corpus.py) in a temporary directory
+and the main build stages are timed there:
+
+  get_all_posts, get_publications       data loading (fresh index and store)
+  generate_blog_listing                 rendering the full blog listing
+  generate_publications_page            rendering the publications page
+  main_cold                             generate_site_new.main(["--force"]) without .build/
+  main_noop                             generate_site_new.main([]) right after a build
+
+Results are written as JSON. Pass --compare with an earlier result file to
+print the change per benchmark and fail if any got slower than --threshold.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.corpus import generate_corpus
+from script import asset_index, metadata_store, generate_site_new
+from script.config import BUILD_DIR
+from script.data_loader import get_all_posts, get_publications, get_talks
+from script.page_generators import generate_blog_listing, generate_publications_page
+
+DEFAULT_SCALES = [10, 1000, 10000]
+DEFAULT_REPEAT = 3
+RESULTS_DIR = REPO_ROOT / BUILD_DIR / "benchmarks"
+
+# Regressions are only reported above this ratio, and for benchmarks slow
+# enough for the difference to be more than timer noise
+DEFAULT_THRESHOLD = 1.2
+MIN_COMPARABLE_SECONDS = 0.005
+
+
+def reset_caches() -> None:
+    """Start from a fresh asset index and an empty in-memory metadata store."""
+    asset_index.build_asset_index()
+    # Bypass the on-disk store so every run pays the parsing cost
+    metadata_store._store = metadata_store.MetadataStore()
+
+
+def time_runs(func: Callable[[], Any], repeat: int, setup: Callable[[], None] = reset_caches) -> Dict[str, Any]:
+    """Time `repeat` calls of func, running setup before each one."""
+    runs = []
+    for _ in range(repeat):
+        setup()
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+    return {
+        "runs": runs,
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "mean": statistics.fmean(runs),
+    }
+
+
+def run_quietly(func: Callable[[], Any]) -> Callable[[], Any]:
+    """Wrap a function so its progress output doesn't flood the benchmark log."""
+    def quiet():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func()
+    return quiet
+
+
+def clean_build_dir() -> None:
+    """Remove the corpus's .build/ and reset caches, so the next build is cold."""
+    shutil.rmtree(BUILD_DIR, ignore_errors=True)
+    reset_caches()
+
+
+def benchmark_scale(scale: int, repeat: int, seed: int) -> Dict[str, Any]:
+    """Generate a corpus of the given scale and time every benchmark on it."""
+    with tempfile.TemporaryDirectory(prefix=f"site-bench-{scale}-") as tmp:
+        sizes = generate_corpus(Path(tmp), scale, seed)
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            reset_caches()
+            posts = get_all_posts()
+            publications, talks = get_publications(), get_talks()
+            benchmarks = {
+                "get_all_posts": time_runs(get_all_posts, repeat),
+                "get_publications": time_runs(get_publications, repeat),
+                "generate_blog_listing": time_runs(
+                    lambda: "".join(generate_blog_listing(posts)), repeat),
+                "generate_publications_page": time_runs(
+                    lambda: "".join(generate_publications_page(publications, talks)), repeat),
+                "main_cold": time_runs(
+                    run_quietly(lambda: generate_site_new.main(["--force"])), repeat, clean_build_dir),
+                "main_noop": time_runs(
+                    run_quietly(lambda: generate_site_new.main([])), repeat, lambda: None),
+            }
+        finally:
+            os.chdir(cwd)
+    return {"sizes": sizes, "benchmarks": benchmarks}
+
+
+def git_commit() -> str:
+    """Short hash of the checked-out commit, or "" outside a git checkout."""
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+    return result.stdout.strip()
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Print median changes against a baseline and return the regressed benchmarks."""
+    regressions = []
+    print(f"\nCompared with {baseline['meta'].get('commit') or 'baseline'} ({baseline['meta']['timestamp']}):")
+    for scale, result in results["results"].items():
+        base_result = baseline["results"].get(scale)
+        if base_result is None:
+            continue
+        for name, timing in result["benchmarks"].items():
+            base_timing = base_result["benchmarks"].get(name)
+            if base_timing is None:
+                continue
+            ratio = timing["median"] / base_timing["median"] if base_timing["median"] else float("inf")
+            flag = ""
+            if ratio > threshold and timing["median"] >= MIN_COMPARABLE_SECONDS:
+                flag = "  ✗ regression"
+                regressions.append(f"{name}@{scale}")
+            print(f"  {name:28} {scale:>6}  {base_timing['median']:9.4f}s -> {timing['median']:9.4f}s  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the site build on synthetic corpora.")
+    parser.add_argument("--scales", type=lambda s: [int(n) for n in s.split(",")], default=DEFAULT_SCALES,
+                        help="comma-separated post counts (default: 10,1000,10000)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help=f"timed runs per benchmark (default: {DEFAULT_REPEAT})")
+    parser.add_argument("--seed", type=int, default=0, help="corpus random seed (default: 0)")
+    parser.add_argument("--output", type=Path, default=None,
+                        help=f"result file (default: {RESULTS_DIR}/<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, default=None, metavar="BASELINE_JSON",
+                        help="earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"slowdown ratio reported as a regression (default: {DEFAULT_THRESHOLD})")
+    args = parser.parse_args(argv)
+
+    started = datetime.now()
+    results = {
+        "meta": {
+            "timestamp": started.isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": {},
+    }
+    for scale in args.scales:
+        print(f"⏱ Benchmarking {scale} posts...")
+        result = benchmark_scale(scale, args.repeat, args.seed)
+        results["results"][str(scale)] = result
+        for name, timing in result["benchmarks"].items():
+            print(f"  {name:28} median {timing['median']:9.4f}s  min {timing['min']:9.4f}s")
+
+    output = args.output or RESULTS_DIR / f"{started:%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"📄 Results written to {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"✗ {len(regressions)} benchmark(s) regressed: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+One-shot filesystem index of post, note and publication assets.
+
+Generators ask "does this PDF/HTML file exist?" many times per build. The
+index scans the asset directories once with os.scandir so those checks become
+set lookups instead of a stat per candidate name.
+"""
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+from .config import POSTS_SRC
+from .profiler import profiled
+
+NOTES_DIR = Path("Notes")
+PUBLICATION_DATA_DIR = Path("publications/data")
+
+# Directories to index and how many levels deep to descend into each
+ASSET_ROOTS = {
+    POSTS_SRC: 2,              # posts/*.tex, posts/<slug>/index.html
+    NOTES_DIR: 2,              # Notes/publication/*.pdf, Notes/<slug>/*.pdf
+    PUBLICATION_DATA_DIR: 1,   # publications/data/*.meta.json
+}
+
+
+class AssetIndex:
+    """Snapshot of the files under the asset roots."""
+
+    def __init__(self, roots: Dict[Path, int] = ASSET_ROOTS):
+        self.roots = roots
+        # directory (posix path) -> entry names in scan order
+        self.entries: Dict[str, List[str]] = {}
+        self.files = set()
+        for root, depth in roots.items():
+            self._scan(root.as_posix(), depth)
+
+    def _scan(self, directory: str, depth: int) -> None:
+        """Record the entries of a directory, descending up to depth levels."""
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except (FileNotFoundError, NotADirectoryError):
+            return
+        self.entries[directory] = [entry.name for entry in entries]
+        for entry in entries:
+            path = f"{directory}/{entry.name}"
+            if entry.is_dir():
+                if depth > 1:
+                    self._scan(path, depth - 1)
+            else:
+                self.files.add(path)
+
+    def _covers(self, path: Path) -> bool:
+        """Whether a path lies within the indexed depth of some root."""
+        for root, depth in self.roots.items():
+            try:
+                relative = path.relative_to(root)
+            except ValueError:
+                continue
+            return len(relative.parts) <= depth
+        return False
+
+    def exists(self, path: Union[str, Path]) -> bool:
+        """Whether a file exists, answered from the index where possible."""
+        path = Path(path)
+        if not self._covers(path):
+            return path.is_file()
+        return path.as_posix() in self.files
+
+    def listdir(self, directory: Union[str, Path], suffix: str = "") -> List[Path]:
+        """Files directly inside an indexed directory, optionally filtered by suffix."""
+        directory = Path(directory)
+        key = directory.as_posix()
+        return [directory / name for name in self.entries.get(key, [])
+                if name.endswith(suffix) and f"{key}/{name}" in self.files]
+
+
+_index: Optional[AssetIndex] = None
+
+
+@profiled("data")
+def build_asset_index() -> AssetIndex:
+    """Scan the asset directories and make the result the shared index."""
+    global _index
+    _index = AssetIndex()
+    return _index
+
+
+def get_asset_index() -> AssetIndex:
+    """Return the shared asset index, building it on first use."""
+    if _index is None:
+        return build_asset_index()
+    return _index
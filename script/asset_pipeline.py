@@ -0,0 +1,328 @@
+"""
+Content-hash fingerprinting and bundling of static assets.
+
+When the "fingerprint_assets" build option is on, every stylesheet, image and
+vendored file under css/, images/ and vendor/ is copied to asset/ with a hash of its content in the
+file name (css/main.css -> asset/css/main.3fa9c01d2e.css). A changed file
+gets a new name, so fingerprinted assets can be cached forever; the build
+emits a `_headers` file (Netlify / Cloudflare Pages) and an nginx snippet
+that mark them immutable.
+
+References between assets (CSS @import and url()) are rewritten to the hashed
+names before hashing, so a change to base.css also renames main.css. Pages
+link assets through asset_url(), which falls back to the plain path when
+fingerprinting is off.
+
+The "bundle_css" build option replaces the css/main.css @import chain with a
+single minified stylesheet (asset/css/bundle.min.css), so the browser fetches
+one file instead of discovering each import in turn. With "per_page", one
+bundle is built per page type (bundle-blog.min.css, ...) without the rules
+scoped to other page types' body classes; pages pick theirs through
+stylesheet_url().
+"""
+import hashlib
+import os
+import posixpath
+import re
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from .config import (
+    ASSETS_DIR, BUILD_DIR, CSS_DIR, CSS_FILES, IMAGES_DIR, POSTS_SRC, VENDOR_DIR, get_settings,
+    KATEX_CSS, KATEX_JS, KATEX_AUTO_RENDER, KATEX_LOCAL_CSS, KATEX_LOCAL_JS, KATEX_LOCAL_AUTO_RENDER
+)
+from .minify import PAGE_CLASSES, minify_css, parse_css, prune_page_rules, serialize_css
+from .output import write_output
+from .profiler import profiled
+
+# Source directories mirrored into asset/, and the file types copied from them
+ASSET_SOURCES = [CSS_DIR, IMAGES_DIR, VENDOR_DIR]
+ASSET_SUFFIXES = {".css", ".js", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".avif",
+                  ".ico", ".woff", ".woff2", ".ttf", ".otf"}
+HASH_LENGTH = 10
+# Precompressed variants written next to assets by script/precompress.py
+SIDECAR_SUFFIXES = {".gz", ".br"}
+
+# Cache headers for fingerprinted files
+CACHE_CONTROL_IMMUTABLE = "public, max-age=31536000, immutable"
+HEADERS_FILE = Path("_headers")
+NGINX_SNIPPET = BUILD_DIR / "nginx-asset-cache.conf"
+
+# @import 'x.css' / @import url(x.css) / url(x.png), with optional quotes
+CSS_REFERENCE = re.compile(r"""(@import\s+(?!url\()|url\(\s*)(['"]?)([^'"()\s]+)\2""")
+
+# A whole @import statement: target and optional media query
+CSS_IMPORT = re.compile(r"""@import\s+(?:url\(\s*(['"]?)([^'"()]+)\1\s*\)|(['"])([^'"]+)\3)\s*([^;]*);""")
+
+# Stylesheet the bundles are built from, and where they are written
+BUNDLE_ENTRY = CSS_FILES[0]
+BUNDLE_DIR = ASSETS_DIR / CSS_DIR
+
+# An asset/ path linked from a built post page (posts/<slug>/index.html)
+POST_ASSET_REFERENCE = re.compile(r"""["'(](?:\.\./)*(""" + re.escape(ASSETS_DIR.as_posix()) + r"""/[^"'()?#\s]+)""")
+
+
+class AssetMap:
+    """Mapping from source asset paths to their fingerprinted copies."""
+
+    def __init__(self, mapping: Dict[str, str], bundles: Dict[str, str] = None):
+        # "css/main.css" -> "asset/css/main.3fa9c01d2e.css"
+        self.mapping = mapping
+        # Page body class ("" for pages without one) -> bundle path
+        self.bundles = bundles or {}
+
+    def url(self, path: str, base_path: str = "") -> str:
+        """URL of an asset relative to a page at base_path."""
+        return base_path + self.mapping.get(path, path)
+
+    def bundle_url(self, page_class: str, base_path: str = "") -> Optional[str]:
+        """URL of the CSS bundle for a page, or None when bundling is off."""
+        bundle = self.bundles.get(page_class if page_class in self.bundles else None)
+        return base_path + bundle if bundle else None
+
+
+def fingerprinted_name(path: Path, data: bytes) -> str:
+    """File name with a content hash inserted before the extension."""
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+    return f"{path.stem}.{digest}{path.suffix}"
+
+
+def _is_local_reference(ref: str) -> bool:
+    """Whether a CSS reference points at a file in this tree."""
+    return not (ref.startswith(("/", "#", "data:")) or "://" in ref)
+
+
+class _Fingerprinter:
+    """Hashes and copies assets, resolving CSS references depth first."""
+
+    def __init__(self, sources: Set[str]):
+        self.sources = sources
+        self.mapping: Dict[str, str] = {}
+        self.in_progress: Set[str] = set()
+
+    def process(self, source: str) -> Optional[str]:
+        """Fingerprint one source file and return its asset path."""
+        if source in self.mapping:
+            return self.mapping[source]
+        if source in self.in_progress:
+            # An @import cycle; leave the reference as it is
+            return None
+        self.in_progress.add(source)
+        path = Path(source)
+        if path.suffix == ".css":
+            text = self._rewrite_css(path, path.read_text(encoding="utf-8"))
+            data = text.encode("utf-8")
+        else:
+            text, data = None, path.read_bytes()
+
+        target = ASSETS_DIR / path.parent / fingerprinted_name(path, data)
+        # The name is derived from the content, so an existing file is up to date
+        if not target.exists():
+            if text is not None:
+                write_output(target, text)
+            else:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                tmp = target.with_name(f".{target.name}.tmp{os.getpid()}")
+                shutil.copyfile(path, tmp)
+                os.replace(tmp, target)
+        self.in_progress.discard(source)
+        self.mapping[source] = target.as_posix()
+        return self.mapping[source]
+
+    def _rewrite_css(self, path: Path, text: str) -> str:
+        """Point local @import and url() references at fingerprinted files."""
+        def replace(match):
+            prefix, quote, ref = match.groups()
+            if not _is_local_reference(ref):
+                return match.group(0)
+            source = posixpath.normpath(posixpath.join(path.parent.as_posix(), ref))
+            if source not in self.sources:
+                return match.group(0)
+            target = self.process(source)
+            if target is None:
+                return match.group(0)
+            relative = posixpath.relpath(target, (ASSETS_DIR / path.parent).as_posix())
+            return f"{prefix}{quote}{relative}{quote}"
+        return CSS_REFERENCE.sub(replace, text)
+
+
+def _inline_css(source: str, mapping: Dict[str, str], seen: Set[str]) -> Tuple[List[str], str]:
+    """Resolve a stylesheet's local @imports in order.
+
+    Returns the external @import statements (which must stay at the top of the
+    bundle) and the inlined text, with url() references rewritten relative to
+    BUNDLE_DIR.
+    """
+    path = Path(source)
+    text = path.read_text(encoding="utf-8")
+    external: List[str] = []
+    parts: List[str] = []
+    position = 0
+    for match in CSS_IMPORT.finditer(text):
+        parts.append(text[position:match.start()])
+        position = match.end()
+        ref = match.group(2) or match.group(4)
+        media = match.group(5).strip()
+        if not _is_local_reference(ref):
+            external.append(match.group(0))
+            continue
+        imported = posixpath.normpath(posixpath.join(path.parent.as_posix(), ref))
+        if imported in seen or not Path(imported).is_file():
+            continue
+        seen.add(imported)
+        imported_external, body = _inline_css(imported, mapping, seen)
+        external.extend(imported_external)
+        parts.append(f"@media {media}{{{body}}}" if media else body)
+    parts.append(text[position:])
+
+    def relocate(match):
+        prefix, quote, ref = match.groups()
+        if prefix.startswith("@import") or not _is_local_reference(ref):
+            return match.group(0)
+        target = posixpath.normpath(posixpath.join(path.parent.as_posix(), ref))
+        target = mapping.get(target, target)
+        return f"{prefix}{quote}{posixpath.relpath(target, BUNDLE_DIR.as_posix())}{quote}"
+    return external, CSS_REFERENCE.sub(relocate, "".join(parts))
+
+
+def build_css_bundles(mapping: Dict[str, str], per_page: bool) -> Dict[str, str]:
+    """Write minified CSS bundles and return page class -> bundle path.
+
+    The single bundle is keyed None; per-page bundles are keyed by body class,
+    with "" for pages that have none (the homepage).
+    """
+    external, body = _inline_css(BUNDLE_ENTRY, mapping, {BUNDLE_ENTRY})
+    nodes = parse_css("".join(external) + body)
+    if per_page:
+        variants = {page_class: page_class[:-len("-page")] for page_class in PAGE_CLASSES}
+        variants[""] = "home"
+    else:
+        variants = {None: ""}
+
+    bundles = {}
+    fingerprint = get_settings().BUILD_FINGERPRINT_ASSETS
+    for page_class, suffix in variants.items():
+        text = serialize_css(prune_page_rules(nodes, page_class)) + "\n"
+        name = Path(f"bundle-{suffix}.min.css" if suffix else "bundle.min.css")
+        if fingerprint:
+            name = Path(fingerprinted_name(name, text.encode("utf-8")))
+        target = BUNDLE_DIR / name
+        write_output(target, text)
+        bundles[page_class] = target.as_posix()
+    return bundles
+
+
+def collect_sources() -> List[str]:
+    """Every fingerprintable file under the asset source directories."""
+    sources = []
+    for directory in ASSET_SOURCES:
+        for path in sorted(directory.rglob("*")):
+            if path.is_file() and path.suffix.lower() in ASSET_SUFFIXES:
+                sources.append(path.as_posix())
+    return sources
+
+
+def post_asset_references() -> Set[str]:
+    """Assets linked by already-built post pages, which pandoc may not rewrite this build."""
+    referenced = set()
+    for page in POSTS_SRC.glob("*/index.html"):
+        try:
+            referenced.update(POST_ASSET_REFERENCE.findall(page.read_text(encoding="utf-8")))
+        except (OSError, UnicodeDecodeError):
+            continue
+    return referenced
+
+
+def remove_stale_assets(current: Set[str]) -> None:
+    """Delete fingerprinted files from previous builds that are no longer referenced.
+
+    Precompressed sidecars (x.css.gz, x.css.br) stay as long as x.css does.
+    """
+    for directory in ASSET_SOURCES:
+        asset_dir = ASSETS_DIR / directory
+        if not asset_dir.is_dir():
+            continue
+        for path in asset_dir.rglob("*"):
+            name = path.as_posix()
+            if path.suffix in SIDECAR_SUFFIXES:
+                name = name[:-len(path.suffix)]
+            if path.is_file() and name not in current:
+                path.unlink()
+
+
+def write_cache_headers() -> None:
+    """Emit cache-header configuration marking fingerprinted assets immutable."""
+    write_output(HEADERS_FILE, f"""# Generated by script/asset_pipeline.py
+/{ASSETS_DIR.as_posix()}/*
+  Cache-Control: {CACHE_CONTROL_IMMUTABLE}
+""")
+    write_output(NGINX_SNIPPET, f"""# Generated by script/asset_pipeline.py; include in the site's server block
+location ~* "^/{ASSETS_DIR.as_posix()}/.+\\.[0-9a-f]{{{HASH_LENGTH}}}\\.[a-z0-9]+$" {{
+    add_header Cache-Control "{CACHE_CONTROL_IMMUTABLE}";
+    access_log off;
+}}
+""")
+
+
+_asset_map: Optional[AssetMap] = None
+
+
+def assets_enabled() -> bool:
+    """Whether any asset pipeline stage is switched on."""
+    settings = get_settings()
+    return bool(settings.BUILD_FINGERPRINT_ASSETS or settings.BUILD_BUNDLE_CSS)
+
+
+@profiled("assets")
+def build_assets() -> AssetMap:
+    """Fingerprint and bundle assets and make the result the shared asset map."""
+    global _asset_map
+    settings = get_settings()
+    mapping: Dict[str, str] = {}
+    if settings.BUILD_FINGERPRINT_ASSETS:
+        sources = collect_sources()
+        fingerprinter = _Fingerprinter(set(sources))
+        for source in sources:
+            fingerprinter.process(source)
+        mapping = fingerprinter.mapping
+        write_cache_headers()
+        print(f"  🔖 Fingerprinted {len(sources)} assets into {ASSETS_DIR}/")
+    bundles: Dict[str, str] = {}
+    if settings.BUILD_BUNDLE_CSS:
+        bundles = build_css_bundles(mapping, settings.BUILD_BUNDLE_CSS == "per_page")
+        print(f"  📦 Bundled {BUNDLE_ENTRY} into {len(bundles)} minified stylesheet(s)")
+    # Keep what built posts still link until they are rebuilt against the new names
+    remove_stale_assets(set(mapping.values()) | set(bundles.values()) | post_asset_references())
+    _asset_map = AssetMap(mapping, bundles)
+    return _asset_map
+
+
+def get_asset_map() -> Optional[AssetMap]:
+    """The shared asset map, or None when the asset pipeline is disabled."""
+    if not assets_enabled():
+        return None
+    if _asset_map is None:
+        return build_assets()
+    return _asset_map
+
+
+def asset_url(path: str, base_path: str = "") -> str:
+    """URL of a css/ or images/ file as referenced from a page at base_path."""
+    assets = get_asset_map()
+    if assets is None:
+        return base_path + path
+    return assets.url(path, base_path)
+
+
+def katex_urls(base_path: str = "") -> Tuple[str, str, str]:
+    """KaTeX stylesheet, script and auto-render URLs: the vendored copy if present, else the CDN."""
+    if not Path(KATEX_LOCAL_JS).is_file():
+        return KATEX_CSS, KATEX_JS, KATEX_AUTO_RENDER
+    return tuple(asset_url(path, base_path) for path in (KATEX_LOCAL_CSS, KATEX_LOCAL_JS, KATEX_LOCAL_AUTO_RENDER))
+
+
+def stylesheet_url(page_class: str = "", base_path: str = "") -> str:
+    """URL of the stylesheet a page with the given body class should link."""
+    assets = get_asset_map()
+    bundle = assets.bundle_url(page_class, base_path) if assets else None
+    return bundle or asset_url(BUNDLE_ENTRY, base_path)
@@ -0,0 +1,115 @@
+"""
+Content-hash build manifest for incremental site generation.
+
+The manifest records, for every generated page, a digest of all the inputs
+its generator declares (see dependencies.py): files, plus the site.meta.json
+sections it reads. A page is only re-rendered when that digest changes or its
+output file has gone missing.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from .config import BUILD_DIR, get_settings
+from .dependencies import input_patterns
+
+MANIFEST_PATH = BUILD_DIR / "manifest.json"
+MANIFEST_VERSION = 3
+
+
+def _sha256_file(path: Path) -> str:
+    """Return the hex SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """Persistent record of page input digests and the outputs they produced."""
+
+    def __init__(self, graph: Dict[str, Dict[str, Any]], path: Path = MANIFEST_PATH):
+        # page -> declared inputs of its generator
+        self.graph = graph
+        self.path = path
+        # page -> {"digest": ..., "outputs": [...]}
+        self.pages: Dict[str, Dict] = {}
+        # path -> [mtime_ns, size, sha256]; lets unchanged files skip re-hashing
+        self.files: Dict[str, List] = {}
+        self._digests: Dict[str, str] = {}
+        self._seen = set()
+
+    @classmethod
+    def load(cls, graph: Dict[str, Dict[str, Any]], path: Path = MANIFEST_PATH) -> "BuildManifest":
+        """Load the manifest from disk, starting empty if it is missing or stale."""
+        manifest = cls(graph, path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return manifest
+        if data.get("version") == MANIFEST_VERSION:
+            manifest.pages = data.get("pages", {})
+            manifest.files = data.get("files", {})
+        return manifest
+
+    def save(self) -> None:
+        """Write the manifest back to disk."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Drop hashes of files that were not inputs of this run (e.g. deleted)
+        files = {key: value for key, value in self.files.items() if key in self._seen}
+        data = {"version": MANIFEST_VERSION, "pages": self.pages, "files": files}
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+
+    def file_hash(self, path: Path) -> str:
+        """Content hash of a file, reusing the recorded hash if its stat is unchanged."""
+        key = path.as_posix()
+        self._seen.add(key)
+        st = os.stat(path)
+        cached = self.files.get(key)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        sha = _sha256_file(path)
+        self.files[key] = [st.st_mtime_ns, st.st_size, sha]
+        return sha
+
+    def inputs_for(self, page: str) -> List[Tuple[str, str]]:
+        """Resolve a page's declared inputs to (name, content hash) pairs."""
+        inputs = self.graph[page]
+        resolved = {}
+        for pattern in input_patterns(inputs):
+            for path in Path(".").glob(pattern):
+                if path.is_file():
+                    resolved[path.as_posix()] = path
+        hashes = [(key, self.file_hash(resolved[key])) for key in sorted(resolved)]
+        site_metadata = get_settings().SITE_METADATA
+        for section in inputs["config"]:
+            value = json.dumps(site_metadata.get(section), sort_keys=True, ensure_ascii=False)
+            hashes.append((f"site.meta.json#{section}", hashlib.sha256(value.encode("utf-8")).hexdigest()))
+        return hashes
+
+    def page_digest(self, page: str) -> str:
+        """Combined digest of every input of a page."""
+        if page not in self._digests:
+            digest = hashlib.sha256()
+            for key, sha in self.inputs_for(page):
+                digest.update(f"{key}\0{sha}\n".encode("utf-8"))
+            self._digests[page] = digest.hexdigest()
+        return self._digests[page]
+
+    def outputs(self, page: str) -> List[str]:
+        """Output files recorded for a page by the previous build."""
+        return self.pages.get(page, {}).get("outputs", [page])
+
+    def is_stale(self, page: str) -> bool:
+        """Whether a page must be re-rendered."""
+        if not all(Path(output).exists() for output in self.outputs(page)):
+            return True
+        return self.pages.get(page, {}).get("digest") != self.page_digest(page)
+
+    def record(self, page: str, outputs: List[str]) -> None:
+        """Mark a page as rendered from its current inputs into the given outputs."""
+        self.pages[page] = {"digest": self.page_digest(page), "outputs": sorted(outputs)}
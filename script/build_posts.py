@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Parallel blog post builder.
+
+Converts posts/YYYY-MM-DD-slug.tex into posts/slug/{content.md,index.html,slug.pdf}.
+Each post is an independent job on a worker pool sized to the machine.
+
+pdflatex runs in a persistent per-post directory, .build/latex/<slug>/, so
+parallel runs never share aux files and reruns start from the previous aux.
+It is rerun until the .aux stops changing, and skipped entirely when the
+post's inputs (the .tex, every local file pdflatex recorded reading, and its
+bibliography) hash the same as when the PDF was last built.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# Add the script directory to the path so we can import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from script.config import POSTS_SRC, TEMPLATES, BUILD_DIR, get_settings
+from script.data_loader import read_metadata
+from script import pandoc_cache
+from script.asset_pipeline import get_asset_map, katex_urls, stylesheet_url
+from script.image_pipeline import get_image_pipeline
+from script.output import write_output
+from script.template_engine import contains_math
+from script.profiler import add_profile_arguments, profiled, stage, start_profiling, stop_profiling
+
+POST_TEMPLATE = TEMPLATES / "markdown_post.html"
+LATEX_SCRATCH = BUILD_DIR / "latex"
+
+# pdflatex passes before giving up on the .aux settling (e.g. oscillating refs)
+MAX_LATEX_RUNS = 5
+# Bump to rebuild every PDF when the LaTeX pipeline changes
+LATEX_RECORD_VERSION = "1"
+LATEX_COMMAND = ["pdflatex", "-interaction=nonstopmode", "-recorder"]
+BIBLIOGRAPHY = re.compile(r"\\(?:bibliography|addbibresource)\{([^}]*)\}")
+
+# Render math elements that pandoc's --katex output leaves for the browser
+KATEX_RENDER_SCRIPT = """  <script>
+    window.addEventListener("load", function() {
+      // Render math elements that already have the math class
+      const mathElements = document.querySelectorAll(".math");
+      mathElements.forEach(function(element) {
+        const isDisplay = element.classList.contains("display");
+        try {
+          katex.render(element.textContent, element, {
+            displayMode: isDisplay,
+            throwOnError: false
+          });
+        } catch (e) {
+          console.error("KaTeX rendering error:", e);
+        }
+      });
+    });
+  </script>
+</head>"""
+
+
+class PostBuildError(Exception):
+    """Raised when an external tool fails while building a post."""
+
+
+def split_post_name(tex_path: Path) -> Optional[tuple]:
+    """Split YYYY-MM-DD-slug.tex into (base, date, slug), or None for bad names."""
+    base = tex_path.stem
+    parts = base.split("-", 3)
+    if len(parts) < 4 or not parts[3]:
+        return None
+    return base, "-".join(parts[:3]), parts[3]
+
+
+def default_title(slug: str) -> str:
+    """Title-case a slug, matching the old shell fallback."""
+    return re.sub(r"\b\w", lambda m: m.group().upper(), slug.replace("-", " "))
+
+
+def run_tool(cmd: List[str], cwd: Optional[Path] = None, env: Optional[dict] = None) -> None:
+    """Run an external tool, raising PostBuildError with its output on failure."""
+    with stage(cmd[0], "external", command=" ".join(cmd)):
+        result = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True,
+                                env=None if env is None else {**os.environ, **env})
+    if result.returncode != 0:
+        output = (result.stdout + result.stderr).strip().splitlines()
+        raise PostBuildError(f"{cmd[0]} failed ({result.returncode}):\n" + "\n".join(output[-20:]))
+
+
+def file_digest(path: Path) -> Optional[str]:
+    """SHA-256 of a file, or None if it doesn't exist."""
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def bibliography_files(tex_path: Path) -> List[Path]:
+    """.bib files named by \\bibliography or \\addbibresource in a post."""
+    text = tex_path.read_text(encoding="utf-8", errors="replace")
+    files = []
+    for names in BIBLIOGRAPHY.findall(text):
+        for name in names.split(","):
+            name = name.strip()
+            if name:
+                files.append(tex_path.parent / (name if name.endswith(".bib") else f"{name}.bib"))
+    return files
+
+
+def recorded_inputs(fls: Path, tex_dir: Path) -> List[Path]:
+    """Local files pdflatex read, from its -recorder .fls file.
+
+    Absolute paths (the TeX distribution, the build directory itself) are
+    left out; relative ones are resolved against the directory pdflatex ran in.
+    """
+    inputs = set()
+    try:
+        lines = fls.read_text(encoding="utf-8", errors="replace").splitlines()
+    except FileNotFoundError:
+        return []
+    for line in lines:
+        if not line.startswith("INPUT "):
+            continue
+        path = Path(line[len("INPUT "):])
+        if not path.is_absolute() and (tex_dir / path).is_file():
+            inputs.add(Path(os.path.normpath(tex_dir / path)))
+    return sorted(inputs)
+
+
+def pdf_inputs_digest(inputs: List[Path]) -> str:
+    """Hash of the LaTeX pipeline version and every input's path and content."""
+    digest = hashlib.sha256(f"v{LATEX_RECORD_VERSION}\0{' '.join(LATEX_COMMAND)}\0".encode("utf-8"))
+    for path in inputs:
+        digest.update(f"{path.as_posix()}\0{file_digest(path)}\0".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def run_bibliography(workdir: Path, base: str, tex_dir: Path) -> None:
+    """Run biber or bibtex if the first pdflatex pass asked for a bibliography."""
+    aux = workdir / f"{base}.aux"
+    if (workdir / f"{base}.bcf").exists():
+        run_tool(["biber", f"--input-directory={tex_dir.resolve()}", base], cwd=workdir)
+    elif aux.exists() and "\\bibdata" in aux.read_text(encoding="utf-8", errors="replace"):
+        run_tool(["bibtex", base], cwd=workdir, env={"BIBINPUTS": f"{tex_dir.resolve()}{os.pathsep}"})
+
+
+def build_pdf(tex_path: Path, base: str, outdir: Path, slug: str) -> Tuple[Optional[Path], bool]:
+    """Compile a post to PDF, unless its inputs are unchanged since the last build.
+
+    Returns the PDF path (None if pdflatex produced none) and whether it was rebuilt.
+    """
+    workdir = LATEX_SCRATCH / slug
+    workdir.mkdir(parents=True, exist_ok=True)
+    record_path = workdir / "inputs.json"
+    target = outdir / f"{slug}.pdf"
+    try:
+        record = json.loads(record_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        record = {}
+    if record and target.exists():
+        inputs = [Path(path) for path in record["inputs"]]
+        if pdf_inputs_digest(inputs) == record["digest"] and file_digest(target) == record["pdf"]:
+            return target, False
+
+    # Run from posts/ so relative \input paths resolve as before, but keep
+    # aux/log/pdf output in this post's own directory
+    output_dir = workdir.resolve()
+    aux = workdir / f"{base}.aux"
+    bbl = workdir / f"{base}.bbl"
+    for run in range(MAX_LATEX_RUNS):
+        previous = (file_digest(aux), file_digest(bbl))
+        run_tool([*LATEX_COMMAND, f"-output-directory={output_dir}", f"{base}.tex"], cwd=tex_path.parent)
+        if run == 0:
+            run_bibliography(workdir, base, tex_path.parent)
+        # Cross-references have settled once a pass leaves the aux (and the
+        # bibliography) as it found them; with a warm aux that is often the first
+        if (file_digest(aux), file_digest(bbl)) == previous:
+            break
+
+    pdf = workdir / f"{base}.pdf"
+    if not pdf.exists():
+        return None, True
+    shutil.move(str(pdf), target)
+    inputs = sorted({*recorded_inputs(workdir / f"{base}.fls", tex_path.parent), tex_path,
+                     *(path for path in bibliography_files(tex_path) if path.exists())})
+    record_path.write_text(json.dumps({
+        "digest": pdf_inputs_digest(inputs),
+        "inputs": [path.as_posix() for path in inputs],
+        "pdf": file_digest(target),
+    }, indent=1), encoding="utf-8")
+    return target, True
+
+
+def convert_post(tex_path: Path, slug: str, meta_args: List[str], html_args: List[str],
+                 content_md: Path, index_html: Path, static_math: bool = False,
+                 katex_args: Optional[List[str]] = None) -> None:
+    """Run both pandoc conversions for a post.
+
+    With static_math, pandoc renders math to MathML and the page loads no
+    KaTeX at all. Otherwise math is left for KaTeX to typeset in the browser,
+    and katex_args (the template's KaTeX link variables) are only passed for
+    posts that contain math. index_html is left as pandoc wrote it; the caller
+    applies image rewriting and minification.
+    """
+    # Generate Markdown version
+    run_tool(["pandoc", str(tex_path), "-t", "markdown", *meta_args,
+              "--resource-path=.:posts", "-o", str(content_md)])
+
+    needs_katex = not static_math and contains_math([content_md.read_text(encoding="utf-8")])
+    if needs_katex:
+        html_args = [*html_args, *(katex_args or [])]
+
+    # Generate HTML from Markdown (this becomes the main index.html)
+    run_tool(["pandoc", str(content_md), "-s", "-t", "html5", "--mathml" if static_math else "--katex",
+              f"--template={POST_TEMPLATE}", f"--metadata=pdf_url:{slug}.pdf",
+              *meta_args, *html_args, "-o", str(index_html)])
+
+    # Add JavaScript for KaTeX rendering
+    if needs_katex:
+        html = index_html.read_text(encoding="utf-8")
+        index_html.write_text(html.replace("</head>", KATEX_RENDER_SCRIPT, 1), encoding="utf-8")
+
+
+def build_post_html(tex_path: Path, date: str, slug: str, outdir: Path) -> Tuple[Path, bool]:
+    """Convert a post to content.md and index.html; return the page and whether it came from the cache."""
+    meta = read_metadata(slug)
+    tags_json = json.dumps(meta.get("tags", []), ensure_ascii=False, separators=(",", ":"))
+    title = meta.get("title") or default_title(slug)
+
+    meta_args = [f"--metadata=title:{title}", f"--metadata=date:{date}",
+                 f"--metadata=tags_json:{tags_json}"]
+    abstract = meta.get("abstract", "")
+    if abstract:
+        abstract_file = outdir / "abstract.txt"
+        abstract_file.write_text(abstract + "\n", encoding="utf-8")
+        meta_args.append(f"--metadata-file={abstract_file}")
+
+    # Link the fingerprinted stylesheet or CSS bundle when the asset pipeline is enabled
+    html_args = []
+    stylesheet = stylesheet_url("post-page", "../../")
+    if stylesheet != "../../css/main.css":
+        html_args.append(f"--variable=stylesheet:{stylesheet}")
+    # KaTeX links for posts with math, from the vendored copy when there is one
+    static_math = get_settings().BUILD_MATH == "mathml"
+    katex_css, katex_js, _ = katex_urls("../../")
+    katex_args = [] if static_math else [f"--variable=katex_css:{katex_css}", f"--variable=katex_js:{katex_js}"]
+
+    # Serve both pandoc conversions from the cache when nothing they depend on changed
+    content_md = outdir / "content.md"
+    index_html = outdir / "index.html"
+    key = pandoc_cache.cache_key(
+        [tex_path, POSTS_SRC / f"{slug}.meta.json", POST_TEMPLATE],
+        [*meta_args, *html_args, *katex_args, KATEX_RENDER_SCRIPT, f"static_math={static_math}"],
+    )
+    files = pandoc_cache.load(key, ["content.md", "index.html"])
+    cached = files is not None
+    if not cached:
+        # Convert next to the cache, not in place, so the post is only replaced below
+        BUILD_DIR.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(prefix=f".{slug}-", dir=BUILD_DIR) as tmp:
+            outputs = {"content.md": Path(tmp) / "content.md", "index.html": Path(tmp) / "index.html"}
+            convert_post(tex_path, slug, meta_args, html_args, outputs["content.md"], outputs["index.html"],
+                         static_math, katex_args)
+            pandoc_cache.store(key, outputs)
+            files = {name: path.read_text(encoding="utf-8") for name, path in outputs.items()}
+    # Written atomically and only if changed; images are rewritten and the page minified here, after
+    # the cache, so an edited image reaches cached posts too
+    write_output(content_md, files["content.md"])
+    write_output(index_html, files["index.html"])
+    return index_html, cached
+
+
+@profiled("post")
+def build_post(tex_path: Path, pdf_only: bool = False) -> str:
+    """Run the full pipeline (or just the PDF) for one post and return a summary line."""
+    names = split_post_name(tex_path)
+    if names is None:
+        return f"Skip {tex_path} (bad name)"
+    base, date, slug = names
+
+    outdir = POSTS_SRC / slug
+    outdir.mkdir(parents=True, exist_ok=True)
+
+    html_note = ""
+    if not pdf_only:
+        index_html, cached = build_post_html(tex_path, date, slug, outdir)
+        html_note = f" -> {index_html}{' (cached)' if cached else ''}"
+
+    # Generate PDF from TeX file
+    pdf, rebuilt = build_pdf(tex_path, base, outdir, slug)
+
+    pdf_note = f", PDF: {pdf}{'' if rebuilt else ' (up to date)'}" if pdf else ""
+    return f"✓ {tex_path.name}{html_note}{pdf_note}"
+
+
+def build_posts(tex_files: List[Path], jobs: Optional[int] = None, pdf_only: bool = False) -> int:
+    """Build posts in parallel and return the number of failed posts."""
+    tex_files = [tex for tex in tex_files if tex.exists()]
+    if not tex_files:
+        print("No TeX files to build")
+        return 0
+
+    # Fingerprint assets and load the image cache up front so worker threads share them
+    get_asset_map()
+    get_image_pipeline()
+    jobs = jobs or os.cpu_count() or 1
+    print(f"Building {len(tex_files)} posts with {jobs} workers...")
+    failures = 0
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(build_post, tex, pdf_only): tex for tex in tex_files}
+        for future in as_completed(futures):
+            tex = futures[future]
+            try:
+                print(future.result())
+            except (PostBuildError, subprocess.CalledProcessError, OSError) as e:
+                failures += 1
+                print(f"✗ {tex.name}: {e}")
+    return failures
+
+
+def main(argv=None):
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Build blog posts from TeX sources.")
+    parser.add_argument("tex_files", nargs="*", type=Path,
+                        help="TeX files to build (default: posts/*.tex)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="number of parallel jobs (default: CPU count)")
+    parser.add_argument("--pdf-only", action="store_true",
+                        help="only (re)build PDFs, skipping the HTML conversion")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    tex_files = args.tex_files or sorted(POSTS_SRC.glob("*.tex"))
+    if args.profile:
+        start_profiling(args.profile_memory)
+    try:
+        failures = build_posts(tex_files, args.jobs, args.pdf_only)
+    finally:
+        if args.profile:
+            stop_profiling(args.profile)
+    if failures:
+        print(f"✗ {failures} post(s) failed to build")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 """
 Configuration settings for the academic portfolio site generator.
 """
+import copy
 import json
 from pathlib import Path
 
@@ -8,56 +9,75 @@ from pathlib import Path
 POSTS_SRC = Path("posts")
 TEMPLATES = Path("templates")
 CSS_DIR = Path("css")
+IMAGES_DIR = Path("images")
+VENDOR_DIR = Path("vendor")
 ASSETS_DIR = Path("asset")
+BUILD_DIR = Path(".build")
+
+# Settings files; parsed on first access and re-read when they change on disk
+SITE_METADATA_FILE = Path("site.meta.json")
+ABOUT_FILE = Path("about.md")
+
+# Fallback values if the metafile doesn't exist
+DEFAULT_SITE_METADATA = {
+    "site": {
+        "title": "Apiros3",
+        "description": "Academic Portfolio", 
+        "author": "Apiros3"
+    },
+    "about": {
+        "title": "About",
+        "content": "Welcome to my academic portfolio. I am a research scientist working at the intersection of mathematics and computer science. My research focuses on algebraic structures, formal methods, and theoretical computer science, with particular emphasis on the connections between algebra and logic in computational systems."
+    },
+    "contact": {
+        "email": "your.email@institution.edu",
+        "institution": "[Your Institution]",
+        "department": "Mathematics & Computer Science",
+        "location": "[Your Location]"
+    },
+    "navigation": {
+        "brand": "Apiros3",
+        "items": [
+            {"name": "About", "url": "./index.html", "current": True},
+            {"name": "Publications", "url": "publications/index.html", "current": False},
+            {"name": "Blog", "url": "posts/index.html", "current": False}
+        ]
+    },
+    "recent_posts": {
+        "title": "Recent Blog Posts",
+        "limit": 5,
+        "show_abstract": False,
+        "show_tags": False
+    }
+}
+
+# Optional build stages, configured in the "build" section of site.meta.json
+DEFAULT_BUILD_OPTIONS = {
+    "fingerprint_assets": False,
+    # false, true (one bundle) or "per_page" (one bundle per page type)
+    "bundle_css": False,
+    "minify_html": False,
+    "precompress": False,
+    # "katex" typesets post math in the browser, "mathml" at build time
+    "math": "katex",
+    "responsive_images": False,
+}
+
 
-# Load site metadata from metafile
 def load_site_metadata():
     """Load site metadata from site.meta.json file."""
     try:
-        with open("site.meta.json", "r", encoding="utf-8") as f:
+        with open(SITE_METADATA_FILE, "r", encoding="utf-8") as f:
             return json.load(f)
     except FileNotFoundError:
         # Fallback to default values if metafile doesn't exist
-        return {
-            "site": {
-                "title": "Apiros3",
-                "description": "Academic Portfolio", 
-                "author": "Apiros3"
-            },
-            "about": {
-                "title": "About",
-                "content": "Welcome to my academic portfolio. I am a research scientist working at the intersection of mathematics and computer science. My research focuses on algebraic structures, formal methods, and theoretical computer science, with particular emphasis on the connections between algebra and logic in computational systems."
-            },
-            "contact": {
-                "email": "your.email@institution.edu",
-                "institution": "[Your Institution]",
-                "department": "Mathematics & Computer Science",
-                "location": "[Your Location]"
-            },
-            "navigation": {
-                "brand": "Apiros3",
-                "items": [
-                    {"name": "About", "url": "./index.html", "current": True},
-                    {"name": "Publications", "url": "publications/index.html", "current": False},
-                    {"name": "Blog", "url": "posts/index.html", "current": False}
-                ]
-            },
-            "recent_posts": {
-                "title": "Recent Blog Posts",
-                "limit": 5,
-                "show_abstract": False,
-                "show_tags": False
-            }
-        }
-
-# Load metadata
-SITE_METADATA = load_site_metadata()
-
-# Load about content from markdown file
-def load_about_content():
+        return copy.deepcopy(DEFAULT_SITE_METADATA)
+
+
+def load_about_content(site_metadata):
     """Load about content from about.md file."""
     try:
-        with open("about.md", "r", encoding="utf-8") as f:
+        with open(ABOUT_FILE, "r", encoding="utf-8") as f:
             content = f.read()
             # Remove the markdown header if present
             if content.startswith("# "):
@@ -66,40 +86,95 @@ def load_about_content():
             return content
     except FileNotFoundError:
         # Fallback to content from site.meta.json if about.md doesn't exist
-        return SITE_METADATA["about"].get("content", "About content not found.")
-
-# Site configuration (from metafile)
-SITE_TITLE = SITE_METADATA["site"]["title"]
-SITE_DESCRIPTION = SITE_METADATA["site"]["description"]
-SITE_AUTHOR = SITE_METADATA["site"]["author"]
-SITE_EMAIL = SITE_METADATA["contact"]["email"]
-SITE_INSTITUTION = SITE_METADATA["contact"]["institution"]
-SITE_DEPARTMENT = SITE_METADATA["contact"].get("department", "")
-SITE_LOCATION = SITE_METADATA["contact"]["location"]
-
-# About section configuration
-ABOUT_TITLE = SITE_METADATA["about"]["title"]
-ABOUT_CONTENT = load_about_content()
-ABOUT_PROFILE_PICTURE = SITE_METADATA["about"].get("profile_picture", "")
-ABOUT_PROFILE_ALT = SITE_METADATA["about"].get("profile_alt", "Profile Picture")
-
-# Navigation configuration
-NAV_BRAND = SITE_METADATA["navigation"]["brand"]
-NAV_ITEMS = SITE_METADATA["navigation"]["items"]
-
-# Recent posts configuration
-RECENT_POSTS_TITLE = SITE_METADATA["recent_posts"]["title"]
-RECENT_POSTS_LIMIT = SITE_METADATA["recent_posts"]["limit"]
-RECENT_POSTS_SHOW_ABSTRACT = SITE_METADATA["recent_posts"]["show_abstract"]
-RECENT_POSTS_SHOW_TAGS = SITE_METADATA["recent_posts"]["show_tags"]
-
-# Notes configuration
-NOTES_TITLE = SITE_METADATA["notes"]["title"]
-NOTES_DESCRIPTION = SITE_METADATA["notes"]["description"]
-
-# Reading list configuration
-READING_LIST_TITLE = SITE_METADATA["reading_list"]["title"]
-READING_LIST_DESCRIPTION = SITE_METADATA["reading_list"]["description"]
+        return site_metadata["about"].get("content", "About content not found.")
+
+
+class SiteSettings:
+    """Site configuration read from site.meta.json and about.md."""
+
+    def __init__(self, site_metadata):
+        self.SITE_METADATA = site_metadata
+
+        # Site configuration (from metafile)
+        self.SITE_TITLE = site_metadata["site"]["title"]
+        self.SITE_DESCRIPTION = site_metadata["site"]["description"]
+        self.SITE_AUTHOR = site_metadata["site"]["author"]
+        self.SITE_EMAIL = site_metadata["contact"]["email"]
+        self.SITE_INSTITUTION = site_metadata["contact"]["institution"]
+        self.SITE_DEPARTMENT = site_metadata["contact"].get("department", "")
+        self.SITE_LOCATION = site_metadata["contact"]["location"]
+
+        # About section configuration
+        self.ABOUT_TITLE = site_metadata["about"]["title"]
+        self.ABOUT_CONTENT = load_about_content(site_metadata)
+        self.ABOUT_PROFILE_PICTURE = site_metadata["about"].get("profile_picture", "")
+        self.ABOUT_PROFILE_ALT = site_metadata["about"].get("profile_alt", "Profile Picture")
+
+        # Navigation configuration
+        self.NAV_BRAND = site_metadata["navigation"]["brand"]
+        self.NAV_ITEMS = site_metadata["navigation"]["items"]
+
+        # Recent posts configuration
+        self.RECENT_POSTS_TITLE = site_metadata["recent_posts"]["title"]
+        self.RECENT_POSTS_LIMIT = site_metadata["recent_posts"]["limit"]
+        self.RECENT_POSTS_SHOW_ABSTRACT = site_metadata["recent_posts"]["show_abstract"]
+        self.RECENT_POSTS_SHOW_TAGS = site_metadata["recent_posts"]["show_tags"]
+
+        # Blog listing configuration (a page size of 0 disables pagination)
+        self.BLOG_PAGE_SIZE = site_metadata.get("blog", {}).get("page_size", 0)
+
+        # Build pipeline options
+        build = {**DEFAULT_BUILD_OPTIONS, **site_metadata.get("build", {})}
+        self.BUILD_FINGERPRINT_ASSETS = build["fingerprint_assets"]
+        self.BUILD_BUNDLE_CSS = build["bundle_css"]
+        self.BUILD_MINIFY_HTML = build["minify_html"]
+        self.BUILD_PRECOMPRESS = build["precompress"]
+        self.BUILD_MATH = build["math"]
+        self.BUILD_RESPONSIVE_IMAGES = build["responsive_images"]
+
+        # Notes configuration
+        self.NOTES_TITLE = site_metadata["notes"]["title"]
+        self.NOTES_DESCRIPTION = site_metadata["notes"]["description"]
+
+        # Reading list configuration
+        self.READING_LIST_TITLE = site_metadata["reading_list"]["title"]
+        self.READING_LIST_DESCRIPTION = site_metadata["reading_list"]["description"]
+
+
+_settings = None
+_settings_stamp = None
+
+
+def _settings_files_stamp():
+    """(mtime, size) of each settings file, or None where it is missing."""
+    stamp = []
+    for path in (SITE_METADATA_FILE, ABOUT_FILE):
+        try:
+            st = path.stat()
+            stamp.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+def get_settings() -> SiteSettings:
+    """Return the cached site settings, reloading them if a settings file changed."""
+    global _settings, _settings_stamp
+    stamp = _settings_files_stamp()
+    if _settings is None or stamp != _settings_stamp:
+        _settings = SiteSettings(load_site_metadata())
+        _settings_stamp = stamp
+    return _settings
+
+
+def __getattr__(name):
+    """Resolve metafile-backed settings (SITE_TITLE, NAV_ITEMS, ...) on first access."""
+    if name.isupper() and not name.startswith("_"):
+        settings = get_settings()
+        if hasattr(settings, name):
+            return getattr(settings, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # CSS files
 CSS_FILES = [
@@ -111,6 +186,13 @@ KATEX_CSS = "https://cdn.jsdelivr.net/npm/katex/dist/katex.min.css"
 KATEX_JS = "https://cdn.jsdelivr.net/npm/katex/dist/katex.min.js"
 KATEX_AUTO_RENDER = "https://cdn.jsdelivr.net/npm/katex/dist/contrib/auto-render.min.js"
 
+# Vendored KaTeX (script/fetch_katex.py), used instead of the CDN when present
+KATEX_VERSION = "0.16.11"
+KATEX_DIR = VENDOR_DIR / "katex"
+KATEX_LOCAL_CSS = (KATEX_DIR / "katex.min.css").as_posix()
+KATEX_LOCAL_JS = (KATEX_DIR / "katex.min.js").as_posix()
+KATEX_LOCAL_AUTO_RENDER = (KATEX_DIR / "contrib" / "auto-render.min.js").as_posix()
+
 # Math rendering configuration
 MATH_DELIMITERS = [
     {"left": "$$", "right": "$$", "display": True},
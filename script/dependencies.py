@@ -0,0 +1,121 @@
+"""
+Page dependency graph.
+
+Every page generator declares what it is built from with @page_inputs: the
+data loaders it consumes, the site.meta.json sections it reads, and the
+templates and stylesheets it links. The declarations resolve to concrete
+inputs for two consumers:
+
+- the build manifest hashes exactly those inputs (site.meta.json per
+  section, so editing one section only invalidates the pages that read it);
+- affected_pages() maps a list of changed paths, e.g. from `git diff
+  --name-only`, to the pages that have to be regenerated.
+"""
+import re
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+from .config import ABOUT_FILE, IMAGES_DIR, KATEX_LOCAL_JS, SITE_METADATA_FILE, get_settings
+
+# Generator code; a change to any module re-renders every page
+CODE_INPUTS = ["script/*.py"]
+
+# Vendored KaTeX; whether (and as what) it exists decides the URLs math pages link
+KATEX_INPUTS = [KATEX_LOCAL_JS]
+
+# Images; every page depends on them once they are fingerprinted (CSS url()s
+# rename the stylesheets pages link) or read for responsive <img> tags
+IMAGE_INPUTS = [f"{IMAGES_DIR.as_posix()}/*"]
+
+# File patterns behind each data loader, keyed by loader name (the
+# SiteData attribute that holds its result)
+LOADER_INPUTS = {
+    "posts": ["posts/*.tex", "posts/*.meta.json", "posts/*.pdf", "posts/*/index.html"],
+    "post_content": ["posts/*/content.md"],
+    "publications": ["publications/data/*.meta.json", "posts/*.pdf", "Notes/publication/*.pdf"],
+    "talks": ["publications/data/*.meta.json"],
+    "notes": ["notes.meta.json"],
+    "reading_list": ["reading-list.meta.json"],
+}
+
+# site.meta.json sections whose content is partly read from another file
+CONFIG_SECTION_FILES = {
+    # about.md, and the profile picture whose fingerprinted name the page links
+    "about": [ABOUT_FILE.as_posix(), "images/*"],
+}
+
+# Sections every page reads through the shared head, navigation and titles
+SHARED_CONFIG = ["site", "navigation", "build"]
+
+LOCAL_CSS_IMPORT = re.compile(r"""@import\s+(?:url\()?\s*['"]?([^'")\s]+\.css)['"]?""")
+
+
+def page_inputs(loaders: Iterable[str] = (), config: Iterable[str] = (),
+                templates: Iterable[str] = (), css: Iterable[str] = ()):
+    """Declare what a page generator is built from."""
+    def declare(generator):
+        generator.page_inputs = {
+            "loaders": list(loaders),
+            "config": SHARED_CONFIG + [section for section in config if section not in SHARED_CONFIG],
+            "templates": list(templates),
+            "css": list(css),
+        }
+        return generator
+    return declare
+
+
+def css_closure(css_files: Iterable[str]) -> List[str]:
+    """Stylesheets plus every local stylesheet they @import, recursively."""
+    seen: List[str] = []
+    pending = list(css_files)
+    while pending:
+        css_file = pending.pop(0)
+        if css_file in seen:
+            continue
+        seen.append(css_file)
+        try:
+            text = Path(css_file).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            continue
+        for target in LOCAL_CSS_IMPORT.findall(text):
+            if "://" not in target:
+                pending.append((Path(css_file).parent / target).as_posix())
+    return seen
+
+
+def input_patterns(inputs: Dict[str, Any]) -> List[str]:
+    """File patterns a page depends on, apart from site.meta.json."""
+    patterns = CODE_INPUTS + KATEX_INPUTS
+    settings = get_settings()
+    if settings.BUILD_FINGERPRINT_ASSETS or settings.BUILD_RESPONSIVE_IMAGES:
+        patterns += IMAGE_INPUTS
+    for loader in inputs["loaders"]:
+        patterns += LOADER_INPUTS[loader]
+    for section in inputs["config"]:
+        patterns += CONFIG_SECTION_FILES.get(section, [])
+    patterns += inputs["templates"]
+    patterns += css_closure(inputs["css"])
+    # Keep the order stable but drop duplicates shared by several loaders
+    return list(dict.fromkeys(patterns))
+
+
+def matches(path: str, pattern: str) -> bool:
+    """Glob match where `*` never crosses a directory separator."""
+    path_parts = Path(path).as_posix().split("/")
+    pattern_parts = pattern.split("/")
+    return len(path_parts) == len(pattern_parts) and all(
+        fnmatchcase(part, pattern_part) for part, pattern_part in zip(path_parts, pattern_parts))
+
+
+def affected_pages(graph: Dict[str, Dict[str, Any]], changed: Iterable[str]) -> List[str]:
+    """Pages whose declared inputs include any of the changed paths."""
+    changed = [Path(path).as_posix() for path in changed]
+    affected = []
+    for page, inputs in graph.items():
+        # Without the previous contents there is no telling which section of
+        # site.meta.json changed, and every page reads some of it
+        if SITE_METADATA_FILE.as_posix() in changed or any(
+                matches(path, pattern) for pattern in input_patterns(inputs) for path in changed):
+            affected.append(page)
+    return affected
+
@@ -0,0 +1,107 @@
+"""
+Local preview server for the generated site.
+
+Serves the repository root over HTTP with validators and compression so that
+reloading a page after a rebuild is cheap:
+
+- every response carries an ETag derived from the file's mtime and size (and
+  the content encoding, so gzip and identity bodies never share one), and
+  `Cache-Control: no-cache`, so the browser revalidates and unchanged files
+  (which write_output leaves untouched) come back as 304 Not Modified;
+- text responses are gzip-compressed for clients that accept it, with the
+  compressed bodies cached per file version.
+"""
+import gzip
+import io
+import os
+import threading
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+
+DEFAULT_PORT = 8000
+
+# Content types worth compressing; images and PDFs are already compressed
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "image/svg+xml")
+
+# (path, mtime/size version) -> gzip body; bounded so a long session doesn't grow without limit
+GZIP_CACHE_SIZE = 256
+
+
+class PreviewRequestHandler(SimpleHTTPRequestHandler):
+    """Static file handler with ETag revalidation and gzip responses."""
+
+    gzip_cache: Dict[Tuple[str, str], bytes] = {}
+    gzip_lock = threading.Lock()
+
+    def log_request(self, code="-", size="-"):
+        """Only log failed requests; a page load would otherwise print a line per asset."""
+        if isinstance(code, int) and code >= 400:
+            super().log_request(code, size)
+
+    def send_head(self):
+        """Serve a file, answering conditional and gzip requests."""
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            # Let the base class handle redirects to "dir/" and index.html lookup
+            if not self.path.split("?", 1)[0].endswith("/"):
+                return super().send_head()
+            path = os.path.join(path, "index.html")
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+
+        version = f"{st.st_mtime_ns:x}-{st.st_size:x}"
+        content_type = self.guess_type(path)
+        body, encoding = self._read_body(path, version, content_type)
+        # Each encoding is its own representation, so it needs its own strong validator
+        etag = f'"{version}-{encoding}"' if encoding else f'"{version}"'
+        if etag in (tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return None
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.end_headers()
+        return io.BytesIO(body)
+
+    def _read_body(self, path: str, version: str, content_type: str) -> Tuple[bytes, str]:
+        """Return the response body and its Content-Encoding ("" for identity)."""
+        with open(path, "rb") as f:
+            raw = f.read()
+        accepts_gzip = "gzip" in self.headers.get("Accept-Encoding", "")
+        if not accepts_gzip or not content_type.startswith(COMPRESSIBLE_TYPES):
+            return raw, ""
+        with self.gzip_lock:
+            compressed = self.gzip_cache.get((path, version))
+        if compressed is None:
+            compressed = gzip.compress(raw, compresslevel=6, mtime=0)
+            with self.gzip_lock:
+                if len(self.gzip_cache) >= GZIP_CACHE_SIZE:
+                    self.gzip_cache.pop(next(iter(self.gzip_cache)))
+                self.gzip_cache[(path, version)] = compressed
+        if len(compressed) >= len(raw):
+            return raw, ""
+        return compressed, "gzip"
+
+
+def start_server(port: int = DEFAULT_PORT, directory: str = ".") -> ThreadingHTTPServer:
+    """Start the preview server on a background thread and return it."""
+    handler = partial(PreviewRequestHandler, directory=directory)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
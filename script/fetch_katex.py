@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Vendor a pinned KaTeX release into vendor/katex/.
+
+Downloads the minified stylesheet, script, auto-render extension and every
+font the stylesheet references. Once vendor/katex/ exists, pages that contain
+math link this copy (fingerprinted along with the other assets when
+"fingerprint_assets" is on) instead of the jsdelivr CDN. Commit the directory
+with the site.
+"""
+import argparse
+import os
+import re
+import shutil
+import sys
+import urllib.request
+from pathlib import Path
+
+# Add the script directory to the path so we can import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from script.config import KATEX_DIR, KATEX_VERSION
+
+KATEX_FILES = ["katex.min.css", "katex.min.js", "contrib/auto-render.min.js"]
+FONT_REFERENCE = re.compile(r"url\((fonts/[^)]+)\)")
+
+
+def download(url: str, target: Path) -> bytes:
+    """Fetch a URL into a file and return its content."""
+    with urllib.request.urlopen(url, timeout=30) as response:
+        data = response.read()
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(data)
+    return data
+
+
+def fetch_katex(version: str = KATEX_VERSION, directory: Path = KATEX_DIR) -> None:
+    """Replace directory with the given KaTeX release."""
+    base_url = f"https://cdn.jsdelivr.net/npm/katex@{version}/dist/"
+    staging = directory.with_name(f".{directory.name}.tmp{os.getpid()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    try:
+        for name in KATEX_FILES:
+            data = download(base_url + name, staging / name)
+            print(f"  ⬇ {name} ({len(data) / 1024:.1f} KiB)")
+        css = (staging / "katex.min.css").read_text(encoding="utf-8")
+        fonts = sorted(set(FONT_REFERENCE.findall(css)))
+        for font in fonts:
+            download(base_url + font, staging / font)
+        print(f"  ⬇ {len(fonts)} font files")
+        (staging / "VERSION").write_text(version + "\n", encoding="utf-8")
+        shutil.rmtree(directory, ignore_errors=True)
+        staging.rename(directory)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def main(argv=None):
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Vendor KaTeX into vendor/katex/.")
+    parser.add_argument("--version", default=KATEX_VERSION,
+                        help=f"KaTeX release to fetch (default: {KATEX_VERSION})")
+    args = parser.parse_args(argv)
+    print(f"Fetching KaTeX {args.version} into {KATEX_DIR}/...")
+    fetch_katex(args.version)
+    print(f"✓ KaTeX {args.version} vendored in {KATEX_DIR}/")
+
+
+if __name__ == "__main__":
+    main()
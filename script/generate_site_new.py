@@ -3,7 +3,10 @@
 Unified site generation script for academic portfolio.
 Generates all HTML pages from metadata and TeX sources.
 """
+import argparse
+from functools import cached_property
 from pathlib import Path
+from typing import List
 import sys
 import os
 
@@ -11,77 +14,190 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from script.data_loader import get_all_posts, get_publications, get_talks, get_notes, get_reading_list, copy_blog_posts, copy_pdf_files
-from script.page_generators import generate_main_index, generate_blog_listing, generate_publications_page, generate_notes_page, generate_reading_list_page
+from script.page_generators import generate_main_index, generate_blog_pages, generate_publications_page, generate_notes_page, generate_reading_list_page, generate_search_page
+from script.search_index import build_search_index
+from script.output import write_output
+from script.build_manifest import BuildManifest
+from script.asset_index import build_asset_index
+from script.metadata_store import get_metadata_store
+from script.asset_pipeline import assets_enabled, build_assets
+from script.config import get_settings
+from script.precompress import precompress_outputs
+from script.dev_server import DEFAULT_PORT
+from script.dependencies import affected_pages
+from script.profiler import add_profile_arguments, profiled, stage, start_profiling, stop_profiling
 
 
-def main():
-    """Main generation function."""
+class SiteData:
+    """Site data, loaded on first use so that skipped pages cost nothing."""
+
+    @cached_property
+    def posts(self):
+        posts = get_all_posts()
+        print(f"Found {len(posts)} blog posts")
+        return posts
+
+    @cached_property
+    def publications(self):
+        publications = get_publications()
+        print(f"Found {len(publications)} publications")
+        return publications
+
+    @cached_property
+    def talks(self):
+        talks = get_talks()
+        print(f"Found {len(talks)} talks")
+        return talks
+
+    @cached_property
+    def notes(self):
+        notes = get_notes()
+        print(f"Found {len(notes)} notes")
+        return notes
+
+    @cached_property
+    def reading_list(self):
+        reading_list = get_reading_list()
+        print(f"Found {len(reading_list)} reading list items")
+        return reading_list
+
+
+# (page, progress label, generator declaring the page's inputs,
+#  renderer returning {output path: html or chunk iterator})
+PAGES = [
+    ("index.html", "main index", generate_main_index,
+     lambda data: {"index.html": generate_main_index(data.posts)}),
+    ("posts/index.html", "blog listing", generate_blog_pages,
+     lambda data: generate_blog_pages(data.posts)),
+    ("publications/index.html", "publications page", generate_publications_page,
+     lambda data: {"publications/index.html": generate_publications_page(data.publications, data.talks)}),
+    ("notes-page/index.html", "notes page", generate_notes_page,
+     lambda data: {"notes-page/index.html": generate_notes_page(data.notes)}),
+    ("reading-list/index.html", "reading list page", generate_reading_list_page,
+     lambda data: {"reading-list/index.html": generate_reading_list_page(data.reading_list)}),
+    ("search/index.html", "search page and index", generate_search_page, lambda data: {
+        "search/index.html": generate_search_page(),
+        **build_search_index(data.posts, data.publications, data.talks, data.notes),
+    }),
+]
+
+# page -> inputs declared by its generator
+PAGE_GRAPH = {page: generator.page_inputs for page, label, generator, render in PAGES}
+
+
+def remove_stale_outputs(old_outputs, new_outputs) -> None:
+    """Delete outputs of a previous build that are no longer generated (e.g. a removed tag)."""
+    for output in set(old_outputs) - set(new_outputs):
+        output_path = Path(output)
+        if output_path.exists():
+            output_path.unlink()
+            print(f"  🗑 Removed stale {output}")
+        # Prune directories left empty, e.g. posts/tags/<tag>/page/2/
+        for parent in output_path.parents:
+            if parent == Path(".") or not parent.is_dir() or any(parent.iterdir()):
+                break
+            parent.rmdir()
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Generate the academic portfolio site.")
+    parser.add_argument("--force", action="store_true",
+                        help="re-render every page, ignoring the build manifest")
+    parser.add_argument("--changed", nargs="+", metavar="PATH",
+                        help="re-render only the pages that depend on these paths "
+                             "(e.g. the output of `git diff --name-only`)")
+    parser.add_argument("--watch", action="store_true",
+                        help="serve the site locally and rebuild affected pages on every change")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help=f"preview server port for --watch (default: {DEFAULT_PORT})")
+    add_profile_arguments(parser)
+    return parser.parse_args(argv)
+
+
+@profiled("build")
+def build_site(force: bool = False, changed: List[str] = None) -> None:
+    """Regenerate every page whose inputs changed since the last build.
+
+    With a list of changed paths, exactly the pages depending on them are
+    re-rendered, whatever the manifest says.
+    """
     print("🚀 Generating academic portfolio...")
     print("📄 Loading site configuration from site.meta.json...")
     
-    # Files are generated in place
-    
-    # Get data
-    posts = get_all_posts()
-    publications = get_publications()
-    talks = get_talks()
-    notes = get_notes()
-    reading_list = get_reading_list()
-    
-    print(f"Found {len(posts)} blog posts")
-    print(f"Found {len(publications)} publications")
-    print(f"Found {len(talks)} talks")
-    print(f"Found {len(notes)} notes")
-    print(f"Found {len(reading_list)} reading list items")
-    
-    # Generate pages
-    print("Generating main index...")
-    main_html = generate_main_index(posts)
-    Path("index.html").write_text(main_html, encoding="utf-8")
-    
-    print("Generating blog listing...")
-    blog_html = generate_blog_listing(posts)
-    # Write blog listing to posts directory (already exists from blog build)
-    Path("posts/index.html").write_text(blog_html, encoding="utf-8")
-    
-    print("Generating publications page...")
-    pub_html = generate_publications_page(publications, talks)
-    # Create publications directory if it doesn't exist
-    publications_dir = Path("publications")
-    publications_dir.mkdir(exist_ok=True)
-    (publications_dir / "index.html").write_text(pub_html, encoding="utf-8")
+    # Files are generated in place; only pages whose inputs changed are rebuilt
+    with stage("check manifest"):
+        manifest = BuildManifest.load(PAGE_GRAPH)
+        if changed is not None:
+            affected = affected_pages(PAGE_GRAPH, changed)
+            stale = [page for page in PAGES if page[0] in affected]
+            print(f"🧭 {len(changed)} changed path(s) affect {len(stale)} page(s)")
+        else:
+            stale = [page for page in PAGES if force or manifest.is_stale(page[0])]
+    if not stale:
+        manifest.save()
+        print("✅ Site is up to date, nothing to generate")
+        # Posts may have been rebuilt since the last run
+        if get_settings().BUILD_PRECOMPRESS:
+            precompress_outputs()
+        return
     
-    print("Generating notes page...")
-    notes_html = generate_notes_page(notes)
-    # Create notes-page directory if it doesn't exist
-    notes_dir = Path("notes-page")
-    notes_dir.mkdir(exist_ok=True)
-    (notes_dir / "index.html").write_text(notes_html, encoding="utf-8")
+    # Scan posts/, Notes/ and publications/data once; generators share the index
+    build_asset_index()
+    if assets_enabled():
+        build_assets()
+    data = SiteData()
+    generated = []
+    unchanged = 0
+    for page, label, generator, render in stale:
+        print(f"Generating {label}...")
+        with stage(label, "page", page=page):
+            outputs = render(data)
+            for output, chunks in outputs.items():
+                if write_output(output, chunks):
+                    generated.append((output, label))
+                else:
+                    unchanged += 1
+            remove_stale_outputs(manifest.outputs(page), outputs)
+            manifest.record(page, list(outputs))
+    with stage("save caches"):
+        manifest.save()
+        get_metadata_store().save()
     
-    print("Generating reading list page...")
-    reading_list_html = generate_reading_list_page(reading_list)
-    # Create reading-list directory if it doesn't exist
-    reading_list_dir = Path("reading-list")
-    reading_list_dir.mkdir(exist_ok=True)
-    (reading_list_dir / "index.html").write_text(reading_list_html, encoding="utf-8")
-    
-    # Copy blog post files
-    print("Copying blog post files...")
-    copy_blog_posts(posts)
-    
-    # Copy PDF files
-    print("Copying PDF files...")
-    copy_pdf_files(posts)
+    if "posts" in data.__dict__:
+        # Copy blog post files
+        print("Copying blog post files...")
+        copy_blog_posts(data.posts)
+        
+        # Copy PDF files
+        print("Copying PDF files...")
+        copy_pdf_files(data.posts)
     
+    if get_settings().BUILD_PRECOMPRESS:
+        precompress_outputs()
+
     print("✅ Site generation completed!")
     print(f"Generated files:")
-    print(f"  📄 index.html (main page)")
-    print(f"  📄 posts/index.html (blog listing)")
-    print(f"  📄 publications/index.html (publications)")
-    print(f"  📄 notes-page/index.html (notes)")
-    print(f"  📄 reading-list/index.html (reading list)")
-    print(f"  📁 posts/ (blog post HTML files)")
-    print(f"  📁 Notes/publication/ (PDF files)")
+    for output, label in generated:
+        print(f"  📄 {output} ({label})")
+    if unchanged:
+        print(f"  ({unchanged} re-rendered files were identical and left untouched)")
+
+
+def main(argv=None):
+    """Main generation function."""
+    args = parse_args(argv)
+    if args.profile:
+        start_profiling(args.profile_memory)
+    try:
+        build_site(args.force, args.changed)
+        if args.watch:
+            # Imported here so plain builds don't pull in the post builder
+            from script.watcher import watch
+            watch(build_site, args.port)
+    finally:
+        if args.profile:
+            stop_profiling(args.profile)
 
 
 if __name__ == "__main__":
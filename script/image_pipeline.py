@@ -0,0 +1,290 @@
+"""
+Responsive images for generated pages.
+
+With the "responsive_images" build option on, every local <img> in a
+generated page (including post HTML) gets its intrinsic width and height, so
+the browser reserves space before the image loads, and decoding="async";
+every image but the first on a page (usually the above-the-fold one) also
+gets loading="lazy".
+
+When Pillow is installed, each image is also resized to IMAGE_WIDTHS (never
+upscaled) and recompressed, in its own format and as WebP, into
+asset/responsive/. The <img> gets a srcset of those variants and is wrapped in
+a <picture> offering the WebP ones first. Variant names carry a hash of the
+source's content, and .build/image-cache.json records what each hash
+produced, so an unchanged image is never decoded or encoded again. Without
+Pillow, only the attributes are added (dimensions come from the file header).
+"""
+import hashlib
+import html
+import json
+import os
+import posixpath
+import re
+import struct
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from .config import ASSETS_DIR, BUILD_DIR
+from .minify import find_tag_end
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = ImageOps = None
+
+IMAGE_CACHE_PATH = BUILD_DIR / "image-cache.json"
+VARIANTS_DIR = ASSETS_DIR / "responsive"
+IMAGE_WIDTHS = [320, 640, 960, 1280, 1920]
+JPEG_QUALITY = 82
+WEBP_QUALITY = 80
+HASH_LENGTH = 10
+# Bump to regenerate every variant when the encoding settings change
+PIPELINE_VERSION = "2"
+
+# Formats that get resized variants, by Pillow format name -> (suffix, MIME type)
+RESIZABLE_FORMATS = {"JPEG": (".jpg", "image/jpeg"), "PNG": (".png", "image/png"), "WEBP": (".webp", "image/webp")}
+
+# EXIF orientations that turn the stored image by 90 degrees, swapping width and height
+EXIF_ORIENTATION_TAG = 0x0112
+TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+# An <img> tag; quoted attribute values may contain ">"
+IMG_TAG = re.compile(r"""<img\b(?:[^>"'=]|=\s*"[^"]*"|=\s*'[^']*'|=)*>""", re.I)
+TAG_ATTRIBUTE = re.compile(r"""([^\s=/>]+)(?:\s*=\s*("[^"]*"|'[^']*'|[^\s>]+))?""")
+
+
+def exif_orientation(exif: bytes) -> int:
+    """The Orientation tag of a JPEG APP1 Exif payload, 1 (upright) if it has none."""
+    tiff = exif[6:]
+    order = {b"II": "<", b"MM": ">"}.get(tiff[:2])
+    if not exif.startswith(b"Exif\0\0") or order is None or len(tiff) < 8:
+        return 1
+    offset = struct.unpack(order + "I", tiff[4:8])[0]
+    if offset + 2 > len(tiff):
+        return 1
+    count = struct.unpack(order + "H", tiff[offset:offset + 2])[0]
+    for start in range(offset + 2, min(offset + 2 + 12 * count, len(tiff) - 11), 12):
+        tag, = struct.unpack(order + "H", tiff[start:start + 2])
+        if tag == EXIF_ORIENTATION_TAG:
+            return struct.unpack(order + "H", tiff[start + 8:start + 10])[0]
+    return 1
+
+
+def read_image_size(path: Path) -> Optional[Tuple[int, int]]:
+    """Displayed width and height from a PNG, GIF or JPEG header, without decoding the image."""
+    with open(path, "rb") as f:
+        head = f.read(26)
+        if head.startswith(b"\x89PNG\r\n\x1a\n") and len(head) >= 24:
+            return struct.unpack(">II", head[16:24])
+        if head[:6] in (b"GIF87a", b"GIF89a") and len(head) >= 10:
+            return struct.unpack("<HH", head[6:10])
+        if not head.startswith(b"\xff\xd8"):
+            return None
+        # Walk the JPEG segments to the first start-of-frame marker
+        f.seek(2)
+        orientation = 1
+        while True:
+            segment = f.read(4)
+            if len(segment) < 4 or segment[0] != 0xFF:
+                return None
+            length = struct.unpack(">H", segment[2:])[0]
+            if length < 2:
+                return None
+            if segment[1] == 0xE1:
+                orientation = exif_orientation(f.read(length - 2))
+                continue
+            if 0xC0 <= segment[1] <= 0xCF and segment[1] not in (0xC4, 0xC8, 0xCC):
+                frame = f.read(5)
+                if len(frame) < 5:
+                    return None
+                height, width = struct.unpack(">xHH", frame)
+                return (height, width) if orientation in TRANSPOSED_ORIENTATIONS else (width, height)
+            f.seek(length - 2, os.SEEK_CUR)
+
+
+class ImagePipeline:
+    """Content-hash-keyed cache of image dimensions and resized variants."""
+
+    def __init__(self, path: Path = IMAGE_CACHE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        # (path, mtime_ns, size) -> digest, so each file is hashed once per build
+        self.digests: Dict[Tuple[str, int, int], str] = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries: Dict[str, Dict[str, Any]] = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def digest(self, source: Path) -> str:
+        """Hash of an image's content and the pipeline settings."""
+        stat = source.stat()
+        key = (source.as_posix(), stat.st_mtime_ns, stat.st_size)
+        if key not in self.digests:
+            digest = hashlib.sha256(source.read_bytes())
+            digest.update(f"\0v{PIPELINE_VERSION}\0{IMAGE_WIDTHS}\0{Image is not None}".encode("utf-8"))
+            self.digests[key] = digest.hexdigest()
+        return self.digests[key]
+
+    def info(self, source: Path) -> Optional[Dict[str, Any]]:
+        """Dimensions and variants of an image, processing it only if its content is new."""
+        digest = self.digest(source)
+        with self.lock:
+            entry = self.entries.get(digest)
+        if entry is not None and all(Path(path).exists()
+                                     for variants in entry["variants"].values() for path, _ in variants):
+            return entry
+        # Decode and encode outside the lock; threads racing on one image write identical variants
+        entry = self._process(source, digest)
+        if entry is not None:
+            with self.lock:
+                self.entries[digest] = entry
+                self.save()
+        return entry
+
+    def _process(self, source: Path, digest: str) -> Optional[Dict[str, Any]]:
+        """Measure an image and write its resized variants; None if it can't be read."""
+        try:
+            return self._measure(source, digest)
+        except (OSError, ValueError, struct.error) as e:
+            # Unsupported (SVG, ICO, AVIF without a plugin) or damaged; leave the tag as written
+            print(f"  ⚠️ Skipping image {source}: {e}")
+            return None
+
+    def _measure(self, source: Path, digest: str) -> Optional[Dict[str, Any]]:
+        """Read an image's dimensions and write its resized variants."""
+        if Image is None:
+            size = read_image_size(source)
+            return {"width": size[0], "height": size[1], "variants": {}} if size else None
+
+        with Image.open(source) as original:
+            variants: Dict[str, List[Tuple[str, int]]] = {}
+            if original.format not in RESIZABLE_FORMATS or getattr(original, "is_animated", False):
+                width, height = original.size
+                if original.getexif().get(EXIF_ORIENTATION_TAG) in TRANSPOSED_ORIENTATIONS:
+                    width, height = height, width
+                return {"width": width, "height": height, "variants": variants}
+            suffix, mime = RESIZABLE_FORMATS[original.format]
+            # Variants are stored upright, as the browser displays the original
+            image = ImageOps.exif_transpose(original)
+            width, height = image.size
+            widths = [w for w in IMAGE_WIDTHS if w < width] + [width]
+            stem = f"{source.stem}.{digest[:HASH_LENGTH]}"
+            VARIANTS_DIR.mkdir(parents=True, exist_ok=True)
+            for target_width in widths:
+                resized = image if target_width == width else image.resize(
+                    (target_width, round(height * target_width / width)), Image.LANCZOS)
+                for out_suffix, out_mime in {suffix: mime, ".webp": "image/webp"}.items():
+                    target = VARIANTS_DIR / f"{stem}-{target_width}w{out_suffix}"
+                    self._save(resized, target, out_suffix)
+                    variants.setdefault(out_mime, []).append((target.as_posix(), target_width))
+        return {"width": width, "height": height, "variants": variants}
+
+    @staticmethod
+    def _save(image, target: Path, suffix: str) -> None:
+        """Encode one variant atomically."""
+        tmp = target.with_name(f".{target.name}.tmp{os.getpid()}-{threading.get_ident()}")
+        if suffix == ".webp":
+            image.save(tmp, "WEBP", quality=WEBP_QUALITY, method=6)
+        elif suffix == ".png":
+            image.save(tmp, "PNG", optimize=True)
+        else:
+            image.convert("RGB").save(tmp, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+        os.replace(tmp, target)
+
+    def save(self) -> None:
+        """Persist the cache."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+
+
+_pipeline: Optional[ImagePipeline] = None
+
+
+def get_image_pipeline() -> ImagePipeline:
+    """The shared image pipeline."""
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = ImagePipeline()
+    return _pipeline
+
+
+def _local_image(src: str, page_dir: str) -> Optional[Path]:
+    """The file an <img src> points at, or None for remote and inline images."""
+    src = html.unescape(src).split("?", 1)[0].split("#", 1)[0]
+    if not src or src.startswith(("/", "data:")) or "://" in src:
+        return None
+    path = Path(posixpath.normpath(posixpath.join(page_dir, src)))
+    return path if path.is_file() else None
+
+
+def rewrite_img_tag(tag: str, page_dir: str, lazy: bool = True) -> str:
+    """Add dimensions, lazy loading and a srcset to one <img> tag."""
+    attributes = {name.lower(): value for name, value in TAG_ATTRIBUTE.findall(tag[len("<img"):])}
+    src = attributes.get("src", "").strip("\"'")
+    source = _local_image(src, page_dir)
+    if source is None:
+        return tag
+    entry = get_image_pipeline().info(source)
+    if entry is None:
+        return tag
+
+    added = []
+    if "width" not in attributes and "height" not in attributes:
+        added.append(f'width="{entry["width"]}" height="{entry["height"]}"')
+    if lazy and "loading" not in attributes:
+        added.append('loading="lazy"')
+    if "decoding" not in attributes:
+        added.append('decoding="async"')
+
+    def srcset(variants) -> str:
+        return ", ".join(f"{posixpath.relpath(path, page_dir)} {width}w" for path, width in variants)
+
+    # Variants in the image's own format go in the srcset, WebP ones in a <source>
+    variants = entry["variants"]
+    webp = variants.get("image/webp")
+    fallback = next((found for mime, found in variants.items() if mime != "image/webp"), webp)
+    sizes = f'(max-width: {entry["width"]}px) 100vw, {entry["width"]}px'
+    if fallback and "srcset" not in attributes:
+        added.append(f'srcset="{srcset(fallback)}" sizes="{sizes}"')
+    else:
+        webp = None
+    end = -2 if tag.endswith("/>") else -1
+    tag = f'{tag[:end].rstrip()} {" ".join(added)}{tag[end:]}' if added else tag
+    if webp and fallback is not webp:
+        return f'<picture><source type="image/webp" srcset="{srcset(webp)}" sizes="{sizes}">{tag}</picture>'
+    return tag
+
+
+def rewrite_images(chunks: Iterable[str], page_path: Path) -> Iterator[str]:
+    """Rewrite the <img> tags in a stream of HTML chunks for a page at page_path."""
+    page_dir = posixpath.dirname(page_path.as_posix()) or "."
+    seen = 0
+
+    def rewrite(text: str) -> str:
+        nonlocal seen
+        def replace(match):
+            nonlocal seen
+            seen += 1
+            # The first image is usually above the fold; don't delay it
+            return rewrite_img_tag(match.group(0), page_dir, lazy=seen > 1)
+        return IMG_TAG.sub(replace, text)
+
+    buffer = ""
+    for chunk in chunks:
+        text = buffer + chunk
+        # Hold back a tag that continues in the next chunk
+        buffer = ""
+        start = text.find("<")
+        while start >= 0:
+            end = find_tag_end(text, start)
+            if end < 0:
+                text, buffer = text[:start], text[start:]
+                break
+            start = text.find("<", end + 1)
+        if text:
+            yield rewrite(text)
+    if buffer:
+        yield rewrite(buffer)
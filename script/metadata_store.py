@@ -0,0 +1,114 @@
+"""
+Persistent store of parsed metadata files.
+
+Every *.meta.json the build reads goes through the store. Parsed documents are
+pickled under .build/ together with the (mtime, size) they were parsed at, so
+a build only re-parses files that changed since the previous one. The main
+generator and the publications submodule script share the same store.
+"""
+import json
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+from .config import BUILD_DIR
+from .asset_index import get_asset_index, PUBLICATION_DATA_DIR
+
+STORE_PATH = BUILD_DIR / "metadata.pickle"
+STORE_VERSION = 1
+
+TALKS_FILE_NAME = "talks.meta.json"
+
+
+class MetadataStore:
+    """Parsed JSON documents keyed by path, invalidated by mtime and size."""
+
+    def __init__(self, path: Path = STORE_PATH):
+        self.path = path
+        # posix path -> (mtime_ns, size, parsed document)
+        self.entries: Dict[str, Tuple[int, int, Any]] = {}
+        self._dirty = False
+
+    @classmethod
+    def load(cls, path: Path = STORE_PATH) -> "MetadataStore":
+        """Load the store from disk, starting empty if it is missing or unreadable."""
+        store = cls(path)
+        try:
+            with open(path, "rb") as f:
+                version, entries = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError, ValueError, TypeError):
+            return store
+        if version == STORE_VERSION:
+            store.entries = entries
+        return store
+
+    def save(self) -> None:
+        """Write the store back to disk if anything was re-parsed."""
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".tmp{os.getpid()}")
+        with open(tmp, "wb") as f:
+            pickle.dump((STORE_VERSION, self.entries), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+    def read_json(self, path: Union[str, Path]) -> Optional[Any]:
+        """Return the parsed contents of a JSON file, or None if it doesn't exist."""
+        key = Path(path).as_posix()
+        try:
+            st = os.stat(key)
+        except FileNotFoundError:
+            if self.entries.pop(key, None) is not None:
+                self._dirty = True
+            return None
+        cached = self.entries.get(key)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        with open(key, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.entries[key] = (st.st_mtime_ns, st.st_size, data)
+        self._dirty = True
+        return data
+
+    def publication_files(self) -> List[Tuple[Path, Dict[str, Any]]]:
+        """Every publications/data/*.meta.json with its parsed contents.
+
+        Documents are shallow copies, so callers may add keys without
+        touching the stored record.
+        """
+        files = []
+        for meta_file in get_asset_index().listdir(PUBLICATION_DATA_DIR, ".meta.json"):
+            data = self.read_json(meta_file)
+            if data is not None:
+                files.append((meta_file, dict(data)))
+        return files
+
+    def publications(self) -> List[Dict[str, Any]]:
+        """Publication records from publications/data, each with the meta_file it came from."""
+        return [{**data, "meta_file": meta_file.as_posix()} for meta_file, data in self.publication_files()
+                if not is_talks_file(meta_file, data)]
+
+    def talks(self) -> List[Dict[str, Any]]:
+        """Talk records from the talks file(s) in publications/data."""
+        talks = []
+        for meta_file, data in self.publication_files():
+            if is_talks_file(meta_file, data):
+                talks.extend(dict(talk) for talk in data.get("talks", []))
+        return talks
+
+
+def is_talks_file(meta_file: Path, data: Dict[str, Any]) -> bool:
+    """Whether a publications/data metafile holds talks rather than a publication."""
+    return meta_file.name == TALKS_FILE_NAME or "talks" in data
+
+
+_store: Optional[MetadataStore] = None
+
+
+def get_metadata_store() -> MetadataStore:
+    """Return the shared metadata store, loading it from disk on first use."""
+    global _store
+    if _store is None:
+        _store = MetadataStore.load()
+    return _store
@@ -0,0 +1,368 @@
+"""
+Minifiers for generated assets.
+
+CSS is parsed into a small tree of rules and at-rule blocks, which makes it
+possible to both minify it and prune rules scoped to other page types (see
+prune_page_rules) without a third-party dependency.
+
+HTML is minified by collapsing whitespace runs in text and inside tags,
+dropping whitespace next to block-level tags, and dropping comments. It works
+on a stream of chunks, so pages can be minified as they are written. The
+contents of <pre>, <textarea>, <script> and <style>, and of math elements
+(<math> and pandoc/KaTeX class="math ..." spans), are left exactly as they
+are.
+"""
+import re
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+# Body classes that scope page-specific CSS rules
+PAGE_CLASSES = ["blog-page", "publications-page", "notes-page", "reading-list-page",
+                "search-page", "post-page"]
+
+# At-rules whose blocks hold rules rather than declarations
+NESTING_AT_RULES = ("@media", "@supports", "@document", "@layer", "@container")
+
+CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+CSS_STRING = re.compile(r""""(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'""")
+WHITESPACE = re.compile(r"\s+")
+SELECTOR_COMBINATOR = re.compile(r"\s*([,>+~])\s*")
+DECLARATION_SPACING = re.compile(r"\s*(!important|,)\s*")
+
+# Elements whose content is copied verbatim
+RAW_ELEMENTS = {"pre", "textarea", "script", "style"}
+VOID_ELEMENTS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+                 "source", "track", "wbr"}
+# Elements that whitespace next to never renders
+BLOCK_ELEMENTS = {"address", "article", "aside", "blockquote", "body", "dd", "details", "div", "dl", "dt",
+                  "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6",
+                  "head", "header", "hr", "html", "li", "link", "main", "meta", "nav", "noscript", "ol",
+                  "option", "p", "script", "section", "select", "style", "summary", "table", "tbody", "td",
+                  "tfoot", "th", "thead", "title", "tr", "ul"}
+# Longest partial closing tag (</textarea) that can straddle two chunks
+RAW_TAIL = len("</textarea ")
+
+HTML_TAG_NAME = re.compile(r"<(/?)([A-Za-z][\w:-]*)")
+# A tag's closing ">" or the opening quote of an attribute value, which may contain ">"
+HTML_TAG_DELIMITER = re.compile(r"""=\s*(["'])|>""")
+HTML_TAG_PART = re.compile(r"""("[^"]*"|'[^']*')|\s+""")
+MATH_CLASS = re.compile(r"""\sclass\s*=\s*["']?[^"'>]*\b(?:math|katex)""", re.I)
+
+# (prelude, declarations) for a rule, (prelude, children) for a nesting
+# at-rule, or a bare statement such as @import ...;
+CssNode = Union[Tuple[str, str], Tuple[str, list], str]
+
+
+def _split_top_level(text: str, separator: str) -> List[str]:
+    """Split on a separator that is not inside parentheses or strings."""
+    parts, depth, quote, start = [], 0, "", 0
+    for i, char in enumerate(text):
+        if quote:
+            if char == quote:
+                quote = ""
+        elif char in "'\"":
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def parse_css(text: str) -> List[CssNode]:
+    """Parse a stylesheet (comments removed) into rule nodes."""
+    nodes, _ = _parse_block(CSS_COMMENT.sub("", text), 0)
+    return nodes
+
+
+def _parse_block(text: str, i: int) -> Tuple[List[CssNode], int]:
+    """Parse rules from position i up to the matching close brace."""
+    nodes: List[CssNode] = []
+    start = i
+    quote = ""
+    while i < len(text):
+        char = text[i]
+        if quote:
+            if char == quote:
+                quote = ""
+        elif char in "'\"":
+            quote = char
+        elif char == ";":
+            # A statement at-rule such as @import or @charset
+            statement = text[start:i].strip()
+            if statement:
+                nodes.append(statement)
+            start = i + 1
+        elif char == "{":
+            prelude = WHITESPACE.sub(" ", text[start:i]).strip()
+            if prelude.lower().startswith(NESTING_AT_RULES):
+                children, i = _parse_block(text, i + 1)
+                nodes.append((prelude, children))
+            else:
+                end = _matching_brace(text, i)
+                nodes.append((prelude, text[i + 1:end]))
+                i = end
+            start = i + 1
+        elif char == "}":
+            return nodes, i
+        i += 1
+    return nodes, i
+
+
+def _matching_brace(text: str, i: int) -> int:
+    """Index of the brace closing the one at i."""
+    depth = 0
+    quote = ""
+    for j in range(i, len(text)):
+        char = text[j]
+        if quote:
+            if char == quote:
+                quote = ""
+        elif char in "'\"":
+            quote = char
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return j
+    return len(text)
+
+
+def _outside_strings(text: str, transform) -> str:
+    """Apply a transform to the parts of text that are not string literals."""
+    parts = []
+    position = 0
+    for match in CSS_STRING.finditer(text):
+        parts.append(transform(text[position:match.start()]))
+        parts.append(match.group(0))
+        position = match.end()
+    parts.append(transform(text[position:]))
+    return "".join(parts).strip()
+
+
+def _minify_selector(prelude: str) -> str:
+    """Collapse whitespace in a selector list or at-rule prelude."""
+    if prelude.startswith("@"):
+        return _outside_strings(prelude, lambda part: WHITESPACE.sub(" ", part).replace(": ", ":"))
+    return _outside_strings(prelude, lambda part: SELECTOR_COMBINATOR.sub(r"\1", WHITESPACE.sub(" ", part)))
+
+
+def _minify_declarations(body: str) -> str:
+    """Collapse a declaration block to prop:value;prop:value."""
+    declarations = []
+    for declaration in _split_top_level(body, ";"):
+        prop, sep, value = declaration.partition(":")
+        prop = prop.strip()
+        if not prop:
+            continue
+        value = _outside_strings(value, lambda part: DECLARATION_SPACING.sub(r"\1", WHITESPACE.sub(" ", part)))
+        declarations.append(f"{prop}{sep}{value}")
+    return ";".join(declarations)
+
+
+def serialize_css(nodes: List[CssNode]) -> str:
+    """Write parsed nodes back out in minified form."""
+    out = []
+    for node in nodes:
+        if isinstance(node, str):
+            out.append(_outside_strings(node, lambda part: WHITESPACE.sub(" ", part)) + ";")
+            continue
+        prelude, body = node
+        if isinstance(body, list):
+            inner = serialize_css(body)
+            if inner:
+                out.append(f"{_minify_selector(prelude)}{{{inner}}}")
+        else:
+            declarations = _minify_declarations(body)
+            if declarations:
+                out.append(f"{_minify_selector(prelude)}{{{declarations}}}")
+    return "".join(out)
+
+
+def minify_css(text: str) -> str:
+    """Strip comments and redundant whitespace from a stylesheet."""
+    return serialize_css(parse_css(text))
+
+
+def prune_page_rules(nodes: List[CssNode], page_class: Optional[str]) -> List[CssNode]:
+    """Drop selectors scoped to a page class other than page_class.
+
+    Rules left without selectors are removed, and so are at-rule blocks left
+    empty. page_class None keeps everything.
+    """
+    if page_class is None:
+        return nodes
+    others = [name for name in PAGE_CLASSES if name != page_class]
+    other_page = re.compile(r"\.(?:%s)(?![\w-])" % "|".join(map(re.escape, others)))
+    pruned: List[CssNode] = []
+    for node in nodes:
+        if isinstance(node, str):
+            pruned.append(node)
+            continue
+        prelude, body = node
+        if isinstance(body, list):
+            children = prune_page_rules(body, page_class)
+            if children:
+                pruned.append((prelude, children))
+            continue
+        if prelude.startswith("@"):
+            pruned.append(node)
+            continue
+        selectors = [selector for selector in _split_top_level(prelude, ",")
+                     if not other_page.search(selector)]
+        if selectors:
+            pruned.append((",".join(selectors), body))
+    return pruned
+
+
+def find_tag_end(text: str, start: int) -> int:
+    """Index of the ">" closing the tag that opens at start, or -1 if text ends first.
+
+    Quoted attribute values are skipped, so alt="a > b" doesn't end the tag.
+    """
+    i = start + 1
+    while True:
+        match = HTML_TAG_DELIMITER.search(text, i)
+        if match is None:
+            return -1
+        if match.group(1) is None:
+            return match.start()
+        i = text.find(match.group(1), match.end()) + 1
+        if i == 0:
+            return -1
+
+
+def _collapse_whitespace(text: str) -> str:
+    """Shrink each whitespace run to a newline if it spans lines, else a space."""
+    return WHITESPACE.sub(lambda m: "\n" if "\n" in m.group() else " ", text)
+
+
+def _collapse_tag(tag: str) -> str:
+    """Collapse whitespace between the attributes of a tag."""
+    tag = HTML_TAG_PART.sub(lambda m: m.group(1) or " ", tag)
+    # Only the space before the tag's own end; a quoted value may contain " >"
+    if tag.endswith((" >", " />")):
+        tag = tag[:tag.rindex(" ")] + tag[tag.rindex(" ") + 1:]
+    return tag
+
+
+class HtmlMinifier:
+    """Incremental HTML whitespace minifier.
+
+    feed() returns the minified form of everything that can be decided so
+    far; an unfinished tag or text run at the end of a chunk is held back
+    until the next one.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        # Closing-tag pattern while inside a raw element
+        self.raw: Optional["re.Pattern"] = None
+        # [tag name, nesting depth] while inside a math element
+        self.preserve: Optional[list] = None
+        # Whitespace-only text, dropped if the next tag is block-level
+        self.pending = ""
+        self.after_block = True
+
+    def feed(self, chunk: str, final: bool = False) -> str:
+        """Minify a chunk; pass final=True with the last one."""
+        text = self.buffer + chunk
+        out = []
+        i, n = 0, len(text)
+        while i < n:
+            if self.raw:
+                match = self.raw.search(text, i)
+                if match is None:
+                    keep = n if final else max(i, n - RAW_TAIL)
+                    out.append(text[i:keep])
+                    i = keep
+                    break
+                out.append(text[i:match.start()])
+                i = match.start()
+                self.raw = None
+            elif text.startswith("<!--", i):
+                end = text.find("-->", i + 4)
+                if end < 0:
+                    break
+                comment = text[i:end + 3]
+                # Keep conditional comments, which some browsers still read
+                if comment.startswith("<!--[if"):
+                    out.append(comment)
+                i = end + 3
+            elif text.startswith("<", i):
+                end = find_tag_end(text, i)
+                if end < 0:
+                    break
+                out.append(self._tag(text[i:end + 1]))
+                i = end + 1
+            else:
+                end = text.find("<", i)
+                if end < 0:
+                    if not final:
+                        break
+                    end = n
+                segment = text[i:end]
+                if self.preserve:
+                    out.append(segment)
+                elif segment.isspace():
+                    if not self.after_block:
+                        self.pending = _collapse_whitespace(self.pending + segment)
+                else:
+                    out.append(self.pending + _collapse_whitespace(segment))
+                    self.pending = ""
+                    self.after_block = False
+                i = end
+        self.buffer = text[i:]
+        if final:
+            out.append(self.buffer)
+            self.buffer = ""
+        return "".join(out)
+
+    def _tag(self, tag: str) -> str:
+        """Minify one tag and track raw and math elements."""
+        match = HTML_TAG_NAME.match(tag)
+        if match is None:
+            # <!DOCTYPE ...> and the like
+            return tag
+        closing, name = match.group(1), match.group(2).lower()
+        self_closing = tag.endswith("/>") or name in VOID_ELEMENTS
+        block = name in BLOCK_ELEMENTS
+        space = "" if block else self.pending
+        self.pending = ""
+        self.after_block = block
+        if self.preserve:
+            if name == self.preserve[0] and not self_closing:
+                self.preserve[1] += -1 if closing else 1
+                if self.preserve[1] == 0:
+                    self.preserve = None
+            if not closing and name in RAW_ELEMENTS:
+                self.raw = re.compile(rf"</{name}\s*>", re.I)
+            return space + tag
+
+        tag = _collapse_tag(tag)
+        if closing or self_closing:
+            return space + tag
+        if name in RAW_ELEMENTS:
+            self.raw = re.compile(rf"</{name}\s*>", re.I)
+        elif name == "math" or MATH_CLASS.search(tag):
+            self.preserve = [name, 1]
+        return space + tag
+
+
+def minify_html_chunks(chunks: Iterable[str]) -> Iterator[str]:
+    """Minify a stream of HTML chunks."""
+    minifier = HtmlMinifier()
+    for chunk in chunks:
+        out = minifier.feed(chunk)
+        if out:
+            yield out
+    yield minifier.feed("", final=True)
+
+
+def minify_html(text: str) -> str:
+    """Minify an HTML document."""
+    return HtmlMinifier().feed(text, final=True)
@@ -0,0 +1,58 @@
+"""
+Output writers for generated files.
+
+Pages are streamed into a temporary file next to their destination and then
+compared with the existing output. Identical results are discarded, so the
+existing file keeps its mtime and downstream rsync/CDN caches stay valid.
+Changed results replace the old file with os.replace, so a build that dies
+mid-write never leaves a half-written page behind.
+
+With the "responsive_images" and "minify_html" build options on, .html
+outputs get their <img> tags rewritten and are minified on the way to disk.
+"""
+import filecmp
+import os
+from pathlib import Path
+from typing import Iterable, Union
+from .config import get_settings
+from .image_pipeline import rewrite_images
+from .minify import minify_html_chunks
+
+# Chunks are coalesced into writes of this size, keeping memory flat however
+# many items a page holds
+WRITE_BUFFER_SIZE = 1 << 16
+
+
+def write_output(path: Union[str, Path], content: Union[str, Iterable[str]]) -> bool:
+    """Stream a string or an iterable of chunks to a file.
+
+    Returns True if the file was created or changed, False if the existing
+    file already had exactly this content.
+    """
+    path = Path(path)
+    # Create the page directory if it doesn't exist
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(content, str):
+        content = (content,)
+    if path.suffix == ".html":
+        settings = get_settings()
+        if settings.BUILD_RESPONSIVE_IMAGES:
+            content = rewrite_images(content, path)
+        if settings.BUILD_MINIFY_HTML:
+            content = minify_html_chunks(content)
+
+    tmp_path = path.with_name(f".{path.name}.tmp{os.getpid()}")
+    try:
+        with open(tmp_path, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as f:
+            for chunk in content:
+                f.write(chunk)
+        # filecmp compares sizes first and only reads both files when they match
+        if path.is_file() and filecmp.cmp(tmp_path, path, shallow=False):
+            tmp_path.unlink()
+            return False
+        os.replace(tmp_path, path)
+        return True
+    except BaseException:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        raise
@@ -1,18 +1,28 @@
 """
 Page generators for different types of pages.
+
+Each generator yields the page as a sequence of chunks, so a writer can
+stream it to disk without ever holding the whole page (or a list of all its
+items) in memory. Page-level generators declare their inputs with
+@page_inputs so the build knows which pages a change affects.
 """
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
 from .template_engine import (
-    generate_html_head, generate_navigation, generate_hero, 
-    generate_contact_sidebar, generate_contact_footer, generate_nav_script,
-    generate_publication_item, generate_talk_item, generate_tag_filters, generate_tag_filter_script
-)
-from .config import (
-    SITE_TITLE, SITE_DESCRIPTION, ABOUT_TITLE, ABOUT_CONTENT, 
-    ABOUT_PROFILE_PICTURE, ABOUT_PROFILE_ALT, NAV_BRAND, NAV_ITEMS,
-    NOTES_TITLE, NOTES_DESCRIPTION, READING_LIST_TITLE, READING_LIST_DESCRIPTION
+    generate_page_open, generate_page_close, generate_hero,
+    generate_contact_sidebar, generate_nav_script,
+    generate_publication_item, generate_talk_item, TagFilters, generate_tag_filter_script,
+    generate_pagination, generate_tag_index, blog_listing_path, post_element_id,
+    generate_search_script, generate_search_form, contains_math
 )
+from .config import get_settings, CSS_FILES
+from .dependencies import page_inputs
+from .asset_pipeline import asset_url
+from .profiler import profiled
+
+# Shared page shell (head, navigation, footer) every page is rendered with;
+# the vendored KaTeX copy changes the math links pages render
+PAGE_TEMPLATES = ["script/template_engine.py", "vendor/katex/*.js"]
 
 
 def format_about_content(content: str) -> str:
@@ -45,52 +55,47 @@ def format_about_content(content: str) -> str:
     return '\n          '.join(formatted_paragraphs)
 
 
-def generate_main_index(posts: List[Dict[str, Any]]) -> str:
+@page_inputs(loaders=["posts"], config=["about", "contact", "recent_posts"],
+             templates=PAGE_TEMPLATES, css=CSS_FILES)
+@profiled("page")
+def generate_main_index(posts: List[Dict[str, Any]]) -> Iterator[str]:
     """Generate the main index page."""
-    return f"""{generate_html_head(f"{SITE_TITLE} - Homepage")}
-<body>
-{generate_navigation("about")}
-
-  <main class="container">
+    settings = get_settings()
+    profile_html = f'<img src="{asset_url(settings.ABOUT_PROFILE_PICTURE)}" alt="{settings.ABOUT_PROFILE_ALT}" class="profile-picture">' if settings.ABOUT_PROFILE_PICTURE else ''
+    yield generate_page_open(f"{settings.SITE_TITLE} - Homepage", "about",
+                             include_math=contains_math([settings.ABOUT_CONTENT]))
+    yield f"""
     <div class="main-layout">
       <div class="main-content">
         <section class="content-section" id="about">
           <div class="about-header">
-            <h2>{ABOUT_TITLE}</h2>
-            {f'<img src="{ABOUT_PROFILE_PICTURE}" alt="{ABOUT_PROFILE_ALT}" class="profile-picture">' if ABOUT_PROFILE_PICTURE else ''}
+            <h2>{settings.ABOUT_TITLE}</h2>
+            {profile_html}
           </div>
-          {format_about_content(ABOUT_CONTENT)}
+          {format_about_content(settings.ABOUT_CONTENT)}
         </section>
       </div>
-    </div>
-  </main>
+    </div>"""
+    yield generate_page_close(footer=True)
 
-{generate_contact_footer()}
-{generate_nav_script()}
-</body>
-</html>"""
 
-
-def generate_blog_listing(posts: List[Dict[str, Any]]) -> str:
-    """Generate the blog listing page."""
-    # Generate all posts
-    all_items = []
-    for post in posts:
-        tags_html = ""
-        if post["tags"]:
-            tags_html = f"""
+def generate_blog_post_item(post: Dict[str, Any], posts_path: str = "") -> str:
+    """Generate a single blog listing entry."""
+    tags_html = ""
+    if post["tags"]:
+        tags_html = f"""
             <div class="post-tags">
-              {''.join(f'<span class="post-tag">#{tag}</span>' for tag in post["tags"])}
+              {''.join(f'<span class="post-tag">#{post_tag}</span>' for post_tag in post["tags"])}
             </div>"""
-        
-        abstract_html = ""
-        if post.get("abstract"):
-            abstract_html = f'<div class="post-abstract">{post["abstract"]}</div>'
-        
-        pdf_link = f'<a href="{post["slug"]}/{post["slug"]}.pdf" class="post-download" target="_blank">PDF</a>' if post.get("has_pdf", False) else ''
-        all_items.append(f"""
-        <li data-tags="{','.join(post["tags"])}">
-          <a href="{post["slug"]}/index.html" class="post-item">
+    
+    abstract_html = ""
+    if post.get("abstract"):
+        abstract_html = f'<div class="post-abstract">{post["abstract"]}</div>'
+    
+    pdf_link = f'<a href="{posts_path}{post["slug"]}/{post["slug"]}.pdf" class="post-download" target="_blank">PDF</a>' if post.get("has_pdf", False) else ''
+    return f"""
+        <li id="{post_element_id(post)}">
+          <a href="{posts_path}{post["slug"]}/index.html" class="post-item">
             <div class="post-header">
               <div class="post-title">{post["title"]}</div>
               {pdf_link}
@@ -101,118 +106,171 @@ def generate_blog_listing(posts: List[Dict[str, Any]]) -> str:
               {tags_html}
             </div>
           </a>
-        </li>""")
-    
-    return f"""{generate_html_head(f"Blog - {SITE_TITLE}", base_path="../")}
-<body class="blog-page">
-{generate_navigation("blog", "../")}
+        </li>"""
 
-  <main class="container">
-    <a href="../index.html" class="back-link">← Back to Mainpage</a>
+
+@profiled("page")
+def generate_blog_listing(posts: List[Dict[str, Any]], all_posts: List[Dict[str, Any]] = None,
+                          tag: str = None, page: int = 1, page_count: int = 1,
+                          tag_filters: TagFilters = None) -> Iterator[str]:
+    """Generate one blog listing page (optionally for a tag and page number).
+
+    tag_filters, built once from all_posts, is shared by every listing page.
+    """
+    settings = get_settings()
+    if all_posts is None:
+        all_posts = posts
+    if tag_filters is None:
+        tag_filters = TagFilters(all_posts)
+    slugs = tag_filters.slugs
+    # Relative prefixes back to posts/ and to the site root
+    posts_path = "../" * blog_listing_path(tag, page, slugs).count("/")
+    base_path = posts_path + "../"
     
-{generate_tag_filters(posts)}
+    title = f"Blog - {settings.SITE_TITLE}"
+    if tag:
+        title = f"{tag.title()} - {title}"
+    if page > 1:
+        title = f"{title} (Page {page})"
+    # In-page tag filtering is only meaningful when every post is listed here
+    complete = tag is None and page_count == 1
+    complete_attr = " data-complete" if complete else ""
     
-    <ul class="post-list">
-      {''.join(all_items)}
-    </ul>
-  </main>
-{generate_nav_script()}
-{generate_tag_filter_script()}
-</body>
-</html>"""
+    include_math = contains_math(post.get(field) for post in posts for field in ("title", "abstract"))
+    yield generate_page_open(title, "blog", base_path, "blog-page", include_math)
+    yield f"""
+    <a href="{base_path}index.html" class="back-link">← Back to Mainpage</a>
+    
+"""
+    yield generate_search_form(f"{base_path}search/index.html")
+    yield "\n"
+    yield tag_filters.render(posts_path, tag)
+    yield f"""
+    
+    <ul class="post-list"{complete_attr}>
+      """
+    for post in posts:
+        yield generate_blog_post_item(post, posts_path)
+    yield """
+    </ul>"""
+    yield generate_pagination(tag, page, page_count, posts_path, slugs)
+    if complete:
+        yield generate_tag_index(posts)
+    yield generate_page_close((generate_nav_script(), generate_tag_filter_script()))
 
 
-def generate_publications_page(publications: List[Dict[str, Any]], talks: List[Dict[str, Any]]) -> str:
-    """Generate the publications page."""
-    # Generate publication items
-    pub_items = []
-    for pub in publications:
-        pub_items.append(generate_publication_item(pub, "../"))
+@page_inputs(loaders=["posts"], config=["blog"], templates=PAGE_TEMPLATES, css=CSS_FILES)
+@profiled("page")
+def generate_blog_pages(posts: List[Dict[str, Any]]) -> Dict[str, Iterator[str]]:
+    """Generate the paginated blog listing plus per-tag listings, keyed by output path."""
+    settings = get_settings()
+    page_size = settings.BLOG_PAGE_SIZE or max(len(posts), 1)
     
-    # Generate talk items
-    talk_items = []
-    for talk in talks:
-        talk_items.append(generate_talk_item(talk, "../"))
+    tag_filters = TagFilters(posts)
+    tagged: Dict[str, List[Dict[str, Any]]] = {tag: [] for tag in tag_filters.tags}
+    for post in posts:
+        for tag in dict.fromkeys(post["tags"]):
+            tagged[tag].append(post)
+    listings = [(None, posts), *tagged.items()]
     
-    return f"""{generate_html_head(f"Publications - {SITE_TITLE}", base_path="../")}
-<body class="publications-page">
-{generate_navigation("publications", "../")}
+    pages = {}
+    for tag, tagged_posts in listings:
+        page_count = max(-(-len(tagged_posts) // page_size), 1)
+        for number in range(1, page_count + 1):
+            chunk = tagged_posts[(number - 1) * page_size:number * page_size]
+            output = "posts/" + blog_listing_path(tag, number, tag_filters.slugs)
+            pages[output] = generate_blog_listing(chunk, posts, tag, number, page_count, tag_filters)
+    return pages
+
 
-  <main class="container">
+@page_inputs(loaders=["publications", "talks"], templates=PAGE_TEMPLATES, css=CSS_FILES)
+@profiled("page")
+def generate_publications_page(publications: List[Dict[str, Any]], talks: List[Dict[str, Any]]) -> Iterator[str]:
+    """Generate the publications page."""
+    settings = get_settings()
+    include_math = contains_math(item.get(field) for item in [*publications, *talks] for field in ("title", "abstract"))
+    yield generate_page_open(f"Publications - {settings.SITE_TITLE}", "publications", "../", "publications-page",
+                             include_math)
+    yield """
     <h2 class="section-title">Publications</h2>
     <ul class="publication-list">
-      {''.join(pub_items)}
+      """
+    # Generate publication items
+    for pub in publications:
+        yield generate_publication_item(pub, "../")
+    yield """
     </ul>
     
     <h2 class="section-title">Talks & Presentations</h2>
     <ul class="publication-list">
-      {''.join(talk_items)}
-    </ul>
-  </main>
-{generate_nav_script()}
-</body>
-</html>"""
+      """
+    # Generate talk items
+    for talk in talks:
+        yield generate_talk_item(talk, "../")
+    yield """
+    </ul>"""
+    yield generate_page_close()
 
 
-def generate_notes_page(notes: List[Dict[str, Any]]) -> str:
-    """Generate the notes page."""
-    # Generate compact note items
-    note_items = []
-    for note in notes:
-        # Handle both single PDF and multiple PDFs
-        pdf_links = []
-        if "pdf_file" in note:
-            pdf_links.append(f'<a href="../Notes/{note["slug"]}/{note["pdf_file"]}" class="note-download" target="_blank">PDF</a>')
-        elif "pdf_files" in note:
-            for pdf_file in note["pdf_files"]:
-                pdf_links.append(f'<a href="../Notes/{note["slug"]}/{pdf_file}" class="note-download" target="_blank">{pdf_file}</a>')
-        
-        pdf_links_html = " | ".join(pdf_links) if pdf_links else ""
-        
-        note_items.append(f"""
+def generate_note_item(note: Dict[str, Any]) -> str:
+    """Generate a single compact note item."""
+    # Handle both single PDF and multiple PDFs
+    pdf_links = []
+    if "pdf_file" in note:
+        pdf_links.append(f'<a href="../Notes/{note["slug"]}/{note["pdf_file"]}" class="note-download" target="_blank">PDF</a>')
+    elif "pdf_files" in note:
+        for pdf_file in note["pdf_files"]:
+            pdf_links.append(f'<a href="../Notes/{note["slug"]}/{pdf_file}" class="note-download" target="_blank">{pdf_file}</a>')
+    
+    pdf_links_html = " | ".join(pdf_links) if pdf_links else ""
+    
+    return f"""
       <li class="note-item">
         <div>
           <div class="note-title">{note["title"]}</div>
           <div class="note-description">{note["description"]}</div>
         </div>
         <div class="note-downloads">{pdf_links_html}</div>
-      </li>""")
-    
-    return f"""{generate_html_head(f"{NOTES_TITLE} - {SITE_TITLE}", base_path="../")}
-<body class="notes-page">
-{generate_navigation("notes-page", "../")}
+      </li>"""
+
 
-  <main class="container">
+@page_inputs(loaders=["notes"], config=["notes"], templates=PAGE_TEMPLATES, css=CSS_FILES)
+@profiled("page")
+def generate_notes_page(notes: List[Dict[str, Any]]) -> Iterator[str]:
+    """Generate the notes page."""
+    settings = get_settings()
+    include_math = contains_math([settings.NOTES_DESCRIPTION,
+                                  *(note.get(field) for note in notes for field in ("title", "description"))])
+    yield generate_page_open(f"{settings.NOTES_TITLE} - {settings.SITE_TITLE}", "notes-page", "../", "notes-page",
+                             include_math)
+    yield f"""
     <a href="../index.html" class="back-link">← Back to Mainpage</a>
     
-    <h1 class="page-title">{NOTES_TITLE}</h1>
-    <p class="page-description">{NOTES_DESCRIPTION}</p>
+    <h1 class="page-title">{settings.NOTES_TITLE}</h1>
+    <p class="page-description">{settings.NOTES_DESCRIPTION}</p>
     
     <ul class="note-list">
-      {''.join(note_items)}
-    </ul>
-  </main>
-{generate_nav_script()}
-</body>
-</html>"""
+      """
+    for note in notes:
+        yield generate_note_item(note)
+    yield """
+    </ul>"""
+    yield generate_page_close()
 
 
-def generate_reading_list_page(reading_list: List[Dict[str, Any]]) -> str:
-    """Generate the reading list page."""
-    # Generate reading list items
-    reading_items = []
-    for item in reading_list:
-        # Format author and year
-        author_year = f"{item['author']} ({item['year']})"
-        
-        # Format status with appropriate styling
-        status_class = f"status-{item['status'].replace('-', '_')}"
-        status_text = item['status'].replace('-', ' ').title()
-        
-        # Format type
-        type_text = item['type'].title()
-        
-        reading_items.append(f"""
+def generate_reading_item(item: Dict[str, Any]) -> str:
+    """Generate a single reading list item."""
+    # Format author and year
+    author_year = f"{item['author']} ({item['year']})"
+    
+    # Format status with appropriate styling
+    status_class = f"status-{item['status'].replace('-', '_')}"
+    status_text = item['status'].replace('-', ' ').title()
+    
+    # Format type
+    type_text = item['type'].title()
+    
+    return f"""
       <li class="reading-item">
         <div>
           <div class="reading-title">{item['title']}</div>
@@ -223,22 +281,46 @@ def generate_reading_list_page(reading_list: List[Dict[str, Any]]) -> str:
           </div>
           <div class="reading-description">{item['description']}</div>
         </div>
-      </li>""")
-    
-    return f"""{generate_html_head(f"{READING_LIST_TITLE} - {SITE_TITLE}", base_path="../")}
-<body class="reading-list-page">
-{generate_navigation("reading-list", "../")}
+      </li>"""
+
 
-  <main class="container">
+@page_inputs(loaders=["reading_list"], config=["reading_list"], templates=PAGE_TEMPLATES, css=CSS_FILES)
+@profiled("page")
+def generate_reading_list_page(reading_list: List[Dict[str, Any]]) -> Iterator[str]:
+    """Generate the reading list page."""
+    settings = get_settings()
+    include_math = contains_math([settings.READING_LIST_DESCRIPTION,
+                                  *(item.get(field) for item in reading_list for field in ("title", "description"))])
+    yield generate_page_open(f"{settings.READING_LIST_TITLE} - {settings.SITE_TITLE}", "reading-list", "../",
+                             "reading-list-page", include_math)
+    yield f"""
     <a href="../index.html" class="back-link">← Back to Mainpage</a>
     
-    <h1 class="page-title">{READING_LIST_TITLE}</h1>
-    <p class="page-description">{READING_LIST_DESCRIPTION}</p>
+    <h1 class="page-title">{settings.READING_LIST_TITLE}</h1>
+    <p class="page-description">{settings.READING_LIST_DESCRIPTION}</p>
     
     <ul class="reading-list">
-      {''.join(reading_items)}
-    </ul>
-  </main>
-{generate_nav_script()}
-</body>
-</html>"""
+      """
+    for item in reading_list:
+        yield generate_reading_item(item)
+    yield """
+    </ul>"""
+    yield generate_page_close()
+
+
+@page_inputs(loaders=["posts", "post_content", "publications", "talks", "notes"],
+             templates=PAGE_TEMPLATES, css=CSS_FILES)
+@profiled("page")
+def generate_search_page() -> Iterator[str]:
+    """Generate the search page."""
+    settings = get_settings()
+    yield generate_page_open(f"Search - {settings.SITE_TITLE}", "search", "../", "search-page")
+    yield """
+    <a href="../index.html" class="back-link">← Back to Mainpage</a>
+    
+    <h1 class="page-title">Search</h1>"""
+    yield generate_search_form("index.html")
+    yield """
+    <p class="search-status"></p>
+    <ul class="search-results"></ul>"""
+    yield generate_page_close((generate_nav_script(), generate_search_script()))
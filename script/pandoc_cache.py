@@ -0,0 +1,80 @@
+"""
+Content-addressed cache for pandoc conversions.
+
+Entries live under .build/pandoc-cache/<key>/ and hold the files produced for
+one post. The key is a hash of everything that can change pandoc's output:
+the TeX source, the post metadata, the HTML template, the pandoc version and
+the arguments the build passes along.
+"""
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+from .config import BUILD_DIR
+
+PANDOC_CACHE_DIR = BUILD_DIR / "pandoc-cache"
+
+# Bump to invalidate every entry when the post pipeline changes shape
+CACHE_VERSION = "1"
+
+
+@lru_cache(maxsize=None)
+def pandoc_version() -> str:
+    """Return the first line of `pandoc --version`."""
+    result = subprocess.run(["pandoc", "--version"], capture_output=True, text=True, check=True)
+    return result.stdout.splitlines()[0].strip()
+
+
+def cache_key(paths: Iterable[Path], extra: Iterable[str] = ()) -> str:
+    """Hash the contents of the given files plus extra strings into a cache key."""
+    digest = hashlib.sha256(f"v{CACHE_VERSION}\0{pandoc_version()}\0".encode("utf-8"))
+    for path in paths:
+        digest.update(path.as_posix().encode("utf-8") + b"\0")
+        if path.exists():
+            digest.update(path.read_bytes())
+        digest.update(b"\0")
+    for item in extra:
+        digest.update(item.encode("utf-8") + b"\0")
+    return digest.hexdigest()
+
+
+def lookup(key: str) -> Optional[Path]:
+    """Return the cache entry directory for a key, or None on a miss."""
+    entry = PANDOC_CACHE_DIR / key
+    return entry if entry.is_dir() else None
+
+
+def load(key: str, names: Iterable[str]) -> Optional[Dict[str, str]]:
+    """Return the text of the named cached files, or None on a miss.
+
+    Callers write the text with write_output, so outputs that are already
+    identical keep their mtime.
+    """
+    entry = lookup(key)
+    if entry is None:
+        return None
+    try:
+        return {name: (entry / name).read_text(encoding="utf-8") for name in names}
+    except FileNotFoundError:
+        return None
+
+
+def store(key: str, files: Dict[str, Union[Path, str]]) -> None:
+    """Store generated files under a key.
+
+    The entry is assembled in a temporary directory and renamed into place, so
+    concurrent jobs never observe a half-written entry.
+    """
+    PANDOC_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=f".{key[:12]}-", dir=PANDOC_CACHE_DIR))
+    try:
+        for name, source in files.items():
+            shutil.copyfile(source, tmp / name)
+        os.rename(tmp, PANDOC_CACHE_DIR / key)
+    except OSError:
+        # Another job stored the same key first; its entry is equivalent
+        shutil.rmtree(tmp, ignore_errors=True)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Precompressed sidecars for static servers.
+
+Writes page.html.gz (and page.html.br when the brotli module is installed)
+next to every generated HTML, CSS, JS and JSON file, at the highest
+compression level, so servers such as nginx (gzip_static / brotli_static) or
+Caddy (precompressed) can serve them without compressing per request.
+
+Only the generated site is compressed: top-level pages and the output
+directories in OUTPUT_DIRS, never the Notes/ or publications/ submodules'
+working trees (publications/index.html aside). Compression runs on a thread
+pool (zlib and brotli release the GIL). .build/precompress.json records each
+file's size, mtime and content hash: a file whose size and mtime are unchanged
+is skipped without being read, and a variant that isn't smaller than its
+source is not kept.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Add the script directory to the path so we can import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from script.config import BUILD_DIR
+from script.profiler import profiled
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PRECOMPRESS_RECORD = BUILD_DIR / "precompress.json"
+COMPRESSIBLE_SUFFIXES = {".html", ".css", ".js", ".json"}
+
+# Generated and served directories, walked recursively, and single output files
+# elsewhere; top-level files are always included
+OUTPUT_DIRS = ["asset", "css", "notes-page", "posts", "reading-list", "search", "vendor"]
+OUTPUT_FILES = ["publications/index.html"]
+# Metadata that sits next to the outputs but is part of the build, not the site
+SOURCE_SUFFIXES = (".meta.json",)
+
+
+def _gzip(data: bytes) -> bytes:
+    """gzip at level 9, with a fixed mtime so output only depends on the input."""
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli(data: bytes) -> bytes:
+    """Brotli at quality 11 with the text-tuned mode."""
+    return brotli.compress(data, quality=11, mode=brotli.MODE_TEXT)
+
+
+def encoders() -> Dict[str, Callable[[bytes], bytes]]:
+    """Sidecar suffix -> compressor for every available encoding."""
+    available = {".gz": _gzip}
+    if brotli is not None:
+        available[".br"] = _brotli
+    return available
+
+
+def _compressible(path: Path) -> bool:
+    """Whether a file is a site file worth compressing."""
+    return path.suffix in COMPRESSIBLE_SUFFIXES and not path.name.endswith(SOURCE_SUFFIXES)
+
+
+def collect_outputs(root: Path = Path(".")) -> List[Path]:
+    """Every compressible site file under the output directories of root."""
+    outputs = [path for path in sorted(root.iterdir()) if path.is_file() and _compressible(path)]
+    outputs += [root / name for name in OUTPUT_FILES if (root / name).is_file()]
+    for output_dir in OUTPUT_DIRS:
+        for directory, dirs, files in os.walk(root / output_dir):
+            dirs[:] = sorted(d for d in dirs if not d.startswith((".", "_")))
+            outputs += [Path(directory) / name for name in sorted(files) if _compressible(Path(name))]
+    return outputs
+
+
+def compress_file(path: Path, compressors: Dict[str, Callable[[bytes], bytes]]) -> Tuple[List[str], int]:
+    """Write the sidecars for one file; return the kept suffixes and bytes saved."""
+    data = path.read_bytes()
+    kept = []
+    saved = 0
+    for suffix, compress in compressors.items():
+        sidecar = path.with_name(path.name + suffix)
+        compressed = compress(data)
+        if len(compressed) >= len(data):
+            # Not worth serving; make sure an older variant doesn't linger
+            if sidecar.exists():
+                sidecar.unlink()
+            continue
+        tmp = sidecar.with_name(f".{sidecar.name}.tmp{os.getpid()}")
+        tmp.write_bytes(compressed)
+        os.replace(tmp, sidecar)
+        kept.append(suffix)
+        saved += len(data) - len(compressed)
+    return kept, saved
+
+
+def _load_record() -> Dict[str, Dict]:
+    """Previously compressed files: path -> {"digest", "mtime_ns", "size", "variants"}."""
+    try:
+        with open(PRECOMPRESS_RECORD, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _digest(path: Path, compressors: Dict[str, Callable[[bytes], bytes]]) -> str:
+    """Hash of a file's content and the encodings it is compressed with."""
+    digest = hashlib.sha256(path.read_bytes())
+    digest.update(",".join(compressors).encode("utf-8"))
+    return digest.hexdigest()
+
+
+@profiled("compress")
+def precompress_outputs(paths: Optional[List[Path]] = None, jobs: Optional[int] = None) -> int:
+    """Compress changed site files and return how many were (re)compressed."""
+    compressors = encoders()
+    full_scan = paths is None
+    paths = collect_outputs() if full_scan else paths
+    previous = _load_record()
+    # A partial run keeps the record of files it wasn't asked about
+    record = {} if full_scan else dict(previous)
+    pending = []
+    encodings = ",".join(compressors)
+    for path in paths:
+        key = path.as_posix()
+        stat = path.stat()
+        entry = previous.get(key)
+        if (entry and entry.get("encodings") == encodings
+                and all(path.with_name(path.name + suffix).exists() for suffix in entry["variants"])):
+            # Same size and mtime: unchanged without reading it; otherwise compare content
+            if (entry.get("mtime_ns"), entry.get("size")) != (stat.st_mtime_ns, stat.st_size):
+                digest = _digest(path, compressors)
+                if entry["digest"] != digest:
+                    pending.append((path, digest))
+                    continue
+            record[key] = {**entry, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+        else:
+            pending.append((path, _digest(path, compressors)))
+
+    saved = 0
+    if pending:
+        with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+            results = pool.map(lambda item: compress_file(item[0], compressors), pending)
+            for (path, digest), (variants, file_saved) in zip(pending, results):
+                stat = path.stat()
+                record[path.as_posix()] = {"digest": digest, "encodings": encodings, "mtime_ns": stat.st_mtime_ns,
+                                           "size": stat.st_size, "variants": variants}
+                saved += file_saved
+
+    # Remove sidecars of files that are gone or no longer part of the site
+    for key, entry in previous.items():
+        if full_scan and key not in record:
+            for suffix in entry["variants"]:
+                Path(key + suffix).unlink(missing_ok=True)
+
+    PRECOMPRESS_RECORD.parent.mkdir(parents=True, exist_ok=True)
+    with open(PRECOMPRESS_RECORD, "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=1, sort_keys=True)
+    names = " and ".join(suffix.lstrip(".") for suffix in compressors)
+    print(f"  🗜 Precompressed {len(pending)} of {len(paths)} files with {names} "
+          f"({saved / 1024:.1f} KiB saved)")
+    return len(pending)
+
+
+def main(argv=None):
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Write .gz/.br sidecars for the generated site.")
+    parser.add_argument("paths", nargs="*", type=Path,
+                        help="files to compress (default: every HTML/CSS/JS/JSON output)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="number of parallel jobs (default: CPU count)")
+    args = parser.parse_args(argv)
+    if brotli is None:
+        print("ℹ️ brotli is not installed; writing gzip sidecars only (pip install brotli)")
+    precompress_outputs(args.paths or None, args.jobs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Build profiler emitting Chrome trace-event JSON.
+
+Stages are marked with the stage() context manager or the @profiled
+decorator. While profiling is off both cost a single check, so the build
+code is instrumented permanently. With --profile every stage becomes a
+complete ("X") event in a trace that chrome://tracing or
+https://ui.perfetto.dev can open; threads (e.g. parallel post builds) show up
+as separate tracks.
+
+With --profile-memory, tracemalloc runs for the whole build and each stage on
+the main thread records the peak and net traced memory it was responsible
+for. tracemalloc is process-wide, so worker-thread stages report timings only.
+"""
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from .config import BUILD_DIR
+
+PROFILE_PATH = BUILD_DIR / "profile.json"
+
+
+class Trace:
+    """Trace events collected during one profiled run."""
+
+    def __init__(self, memory: bool = False):
+        self.memory = memory
+        self.events: List[Dict[str, Any]] = []
+        self.start = time.perf_counter()
+        self.lock = threading.Lock()
+        # Stack of open main-thread stages: [start bytes, peak of finished children]
+        self.memory_stack: List[List[int]] = []
+        self.thread_ids: Dict[int, int] = {}
+
+    def timestamp(self) -> float:
+        """Microseconds since profiling started."""
+        return (time.perf_counter() - self.start) * 1e6
+
+    def thread_id(self) -> int:
+        """Small stable id for the current thread, named in the trace metadata."""
+        ident = threading.get_ident()
+        with self.lock:
+            if ident not in self.thread_ids:
+                tid = len(self.thread_ids)
+                self.thread_ids[ident] = tid
+                self.events.append({"ph": "M", "name": "thread_name", "pid": os.getpid(), "tid": tid,
+                                    "args": {"name": threading.current_thread().name}})
+            return self.thread_ids[ident]
+
+    def add(self, event: Dict[str, Any]) -> None:
+        """Append an event from any thread."""
+        with self.lock:
+            self.events.append(event)
+
+    def write(self, path: Path) -> None:
+        """Write the trace as Chrome trace-event JSON."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+
+_trace: Optional[Trace] = None
+
+
+def start_profiling(memory: bool = False) -> None:
+    """Start collecting trace events, and tracemalloc snapshots if requested."""
+    global _trace
+    _trace = Trace(memory)
+    if memory:
+        tracemalloc.start()
+
+
+def stop_profiling(path: Path = PROFILE_PATH) -> None:
+    """Write the collected trace and stop profiling."""
+    global _trace
+    if _trace is None:
+        return
+    if _trace.memory:
+        tracemalloc.stop()
+    _trace.write(path)
+    print(f"⏱ Wrote build profile to {path} ({len(_trace.events)} events)")
+    _trace = None
+
+
+@contextmanager
+def stage(name: str, category: str = "build", **args):
+    """Record the enclosed block as one trace event."""
+    trace = _trace
+    if trace is None:
+        yield
+        return
+
+    tid = trace.thread_id()
+    track_memory = trace.memory and threading.current_thread() is threading.main_thread()
+    if track_memory:
+        current, peak = tracemalloc.get_traced_memory()
+        if trace.memory_stack:
+            # Bank the enclosing stage's peak so far before resetting the counter
+            parent = trace.memory_stack[-1]
+            parent[1] = max(parent[1], peak)
+        tracemalloc.reset_peak()
+        trace.memory_stack.append([current, 0])
+    start = trace.timestamp()
+    try:
+        yield
+    finally:
+        event = {"ph": "X", "name": name, "cat": category, "ts": start,
+                 "dur": trace.timestamp() - start, "pid": os.getpid(), "tid": tid}
+        if track_memory:
+            start_bytes, child_peak = trace.memory_stack.pop()
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, child_peak)
+            if trace.memory_stack:
+                parent = trace.memory_stack[-1]
+                parent[1] = max(parent[1], peak)
+            args = dict(args, peak_kib=round((peak - start_bytes) / 1024, 1),
+                        net_kib=round((current - start_bytes) / 1024, 1))
+        if args:
+            event["args"] = {key: value if isinstance(value, (int, float, str)) else str(value)
+                             for key, value in args.items()}
+        trace.add(event)
+
+
+def profiled(category: str = "build"):
+    """Decorator recording each call of a function as a stage.
+
+    Generator functions are timed until the generator is exhausted, which
+    for the streamed page generators includes writing the page to disk.
+    """
+    def decorate(func):
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with stage(func.__name__, category):
+                    yield from func(*args, **kwargs)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with stage(func.__name__, category):
+                    return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def add_profile_arguments(parser) -> None:
+    """Add --profile and --profile-memory to a command line parser."""
+    parser.add_argument("--profile", nargs="?", type=Path, const=PROFILE_PATH, default=None,
+                        metavar="TRACE_JSON",
+                        help=f"write a Chrome trace of the build (default: {PROFILE_PATH})")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="with --profile, record tracemalloc peak memory per stage")
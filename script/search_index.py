@@ -0,0 +1,169 @@
+"""
+Build-time full-text search index.
+
+Posts (their converted content.md), publication and talk abstracts and note
+descriptions are tokenized into an inverted index that is split into small
+JSON shards by term prefix. The search page only fetches the shards for the
+terms in a query, so no search backend is needed.
+
+Outputs (relative to the site root):
+  search/docs.json            document table: [{"t": title, "u": url, "k": kind}]
+  search/shards/<prefix>.json {term: [[doc index, term frequency], ...]}
+"""
+import hashlib
+import json
+import re
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+from .config import BUILD_DIR, POSTS_SRC
+from .profiler import profiled
+
+SEARCH_DIR = "search"
+SHARD_PREFIX_LENGTH = 2
+MIN_TERM_LENGTH = 2
+
+# Tokenized documents from the previous build, keyed by document id
+SEARCH_CACHE_PATH = BUILD_DIR / "search-cache.json"
+SEARCH_CACHE_VERSION = 1
+
+STOP_WORDS = frozenset("""
+a an and are as at be but by for from has have in is it its of on or that the
+this to was were which with we our us not can will these those into than then
+""".split())
+
+# LaTeX commands and markdown link targets carry no searchable words
+LATEX_COMMAND = re.compile(r"\\[a-zA-Z]+")
+MARKDOWN_LINK_TARGET = re.compile(r"\]\([^)]*\)")
+WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase index terms."""
+    text = MARKDOWN_LINK_TARGET.sub("]", LATEX_COMMAND.sub(" ", text))
+    return [term for term in WORD.findall(text.lower())
+            if len(term) >= MIN_TERM_LENGTH and term not in STOP_WORDS]
+
+
+def shard_name(term: str) -> str:
+    """Shard a term belongs to."""
+    return term[:SHARD_PREFIX_LENGTH]
+
+
+def _unique_ids(documents: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Suffix "#2", "#3", ... to ids already taken by an earlier document."""
+    seen: Dict[str, int] = {}
+    for doc in documents:
+        base = doc["id"]
+        seen[base] = seen.get(base, 0) + 1
+        if seen[base] > 1:
+            doc["id"] = f"{base}#{seen[base]}"
+    return documents
+
+
+def collect_documents(posts: List[Dict[str, Any]], publications: List[Dict[str, Any]],
+                      talks: List[Dict[str, Any]], notes: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """Turn data_loader records into searchable documents."""
+    documents = []
+    for post in posts:
+        content_path = POSTS_SRC / post["slug"] / "content.md"
+        content = content_path.read_text(encoding="utf-8") if content_path.exists() else ""
+        documents.append({
+            "id": f"post:{post['slug']}",
+            "kind": "post",
+            "title": post["title"],
+            "url": f"posts/{post['slug']}/index.html",
+            "text": " ".join([post["title"], post.get("abstract", ""), " ".join(post["tags"]), content]),
+        })
+    for pub in publications:
+        authors = pub.get("authors", [])
+        if isinstance(authors, list):
+            authors = " ".join(authors)
+        documents.append({
+            "id": f"publication:{pub.get('meta_file') or pub.get('title', '')}",
+            "kind": "publication",
+            "title": pub.get("title", "Untitled"),
+            "url": "publications/index.html",
+            "text": " ".join([pub.get("title", ""), str(authors), pub.get("conference", ""), pub.get("abstract", "")]),
+        })
+    for talk in talks:
+        documents.append({
+            "id": f"talk:{talk.get('title', '')}:{talk.get('date', '')}",
+            "kind": "talk",
+            "title": talk.get("title", "Untitled"),
+            "url": "publications/index.html",
+            "text": " ".join([talk.get("title", ""), talk.get("venue", ""), talk.get("abstract", "")]),
+        })
+    for note in notes:
+        documents.append({
+            "id": f"note:{note.get('slug', note.get('title', ''))}",
+            "kind": "note",
+            "title": note.get("title", "Untitled"),
+            "url": "notes-page/index.html",
+            "text": " ".join([note.get("title", ""), note.get("description", "")]),
+        })
+    # Talks or notes with the same title (and date) must not share cached term counts
+    return _unique_ids(documents)
+
+
+def _load_cache() -> Dict[str, Any]:
+    """Term counts of previously indexed documents, keyed by document id."""
+    try:
+        with open(SEARCH_CACHE_PATH, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if cache.get("version") != SEARCH_CACHE_VERSION:
+        return {}
+    return cache.get("documents", {})
+
+
+def _save_cache(documents: Dict[str, Any]) -> None:
+    """Persist term counts for the next incremental build."""
+    SEARCH_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(SEARCH_CACHE_PATH, "w", encoding="utf-8") as f:
+        json.dump({"version": SEARCH_CACHE_VERSION, "documents": documents}, f, ensure_ascii=False)
+
+
+def _term_counts(documents: List[Dict[str, str]]) -> Tuple[List[Dict[str, int]], int]:
+    """Term frequencies per document, reusing cached counts for unchanged text."""
+    cache = _load_cache()
+    updated = {}
+    counts = []
+    reindexed = 0
+    for doc in documents:
+        digest = hashlib.sha256(doc["text"].encode("utf-8")).hexdigest()
+        cached = cache.get(doc["id"])
+        if cached and cached["hash"] == digest:
+            terms = cached["terms"]
+        else:
+            terms = dict(Counter(tokenize(doc["text"])))
+            reindexed += 1
+        updated[doc["id"]] = {"hash": digest, "terms": terms}
+        counts.append(terms)
+    if reindexed or len(updated) != len(cache):
+        _save_cache(updated)
+    return counts, reindexed
+
+
+@profiled("search")
+def build_search_index(posts: List[Dict[str, Any]], publications: List[Dict[str, Any]],
+                       talks: List[Dict[str, Any]], notes: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Build the sharded index and return its files keyed by output path."""
+    documents = collect_documents(posts, publications, talks, notes)
+    counts, reindexed = _term_counts(documents)
+    print(f"  🔎 Indexed {len(documents)} documents ({reindexed} re-tokenized)")
+
+    shards: Dict[str, Dict[str, List[List[int]]]] = {}
+    for index, terms in enumerate(counts):
+        for term, frequency in terms.items():
+            shards.setdefault(shard_name(term), {}).setdefault(term, []).append([index, frequency])
+
+    outputs = {
+        f"{SEARCH_DIR}/docs.json": json.dumps(
+            [{"t": doc["title"], "u": doc["url"], "k": doc["kind"]} for doc in documents],
+            ensure_ascii=False, separators=(",", ":")),
+    }
+    for name, postings in sorted(shards.items()):
+        outputs[f"{SEARCH_DIR}/shards/{name}.json"] = json.dumps(
+            postings, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+    return outputs
@@ -1,31 +1,59 @@
 """
 Template engine for generating HTML pages.
 """
+import hashlib
+import json
+import re
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 from .config import (
-    SITE_TITLE, SITE_DESCRIPTION, SITE_AUTHOR, SITE_EMAIL, 
-    SITE_INSTITUTION, SITE_DEPARTMENT, SITE_LOCATION,
-    CSS_FILES, KATEX_CSS, KATEX_JS, KATEX_AUTO_RENDER, MATH_DELIMITERS,
-    NAV_BRAND, NAV_ITEMS, PUB_LINK_COLORS
+    get_settings, CSS_FILES, MATH_DELIMITERS,
+    PUB_LINK_COLORS
 )
+from .asset_index import get_asset_index
+from .asset_pipeline import get_asset_map, katex_urls
 
+# Text KaTeX would typeset: $$...$$, \[...\], \(...\) or a one-line $...$
+MATH_PATTERN = re.compile(r"\$\$.+?\$\$|\\\[.+?\\\]|\\\(.+?\\\)|(?<![\\$])\$(?=\S)[^$\n]*?(?<=[^\s\\])\$", re.S)
 
-def generate_html_head(title: str, css_files: List[str] = None, include_math: bool = False, base_path: str = "") -> str:
-    """Generate HTML head section."""
-    if css_files is None:
-        css_files = CSS_FILES
-    
-    css_links = ""
-    for css_file in css_files:
-        css_links += f'  <link rel="stylesheet" href="{base_path}{css_file}">\n'
+
+# Static fragments are rendered once per (settings, page kind, base_path) and
+# memoized. Settings objects hash by identity, so a reloaded site.meta.json
+# produces fresh cache entries instead of stale ones.
+HEAD_OPEN = """<!doctype html>
+<html lang="en">
+<head>
+  <meta charset="utf-8"/>
+  <meta name="viewport" content="width=device-width,initial-scale=1"/>
+  <title>"""
+
+NAV_SCRIPT = """  <script>
+    function toggleNav() {
+      const nav = document.querySelector('.main-nav');
+      nav.classList.toggle('show');
+    }
+  </script>"""
+
+
+@lru_cache(maxsize=64)
+def _html_head_tail(assets, css_files: Tuple[str, ...], math_urls: Optional[Tuple[str, str, str]],
+                    base_path: str, page_class: str) -> str:
+    """Render everything in the head after the title; math_urls are the KaTeX links, if any."""
+    bundle = assets.bundle_url(page_class, base_path) if assets and css_files == tuple(CSS_FILES) else None
+    if bundle:
+        css_urls = [bundle]
+    else:
+        css_urls = [assets.url(css_file, base_path) if assets else base_path + css_file for css_file in css_files]
+    css_links = "".join(f'  <link rel="stylesheet" href="{css_url}">\n' for css_url in css_urls)
     
     math_links = ""
     math_script = ""
-    if include_math:
-        math_links = f'''  <link rel="stylesheet" href="{KATEX_CSS}">
-  <script defer src="{KATEX_JS}"></script>
-  <script defer src="{KATEX_AUTO_RENDER}"></script>'''
+    if math_urls:
+        katex_css, katex_js, katex_auto_render = math_urls
+        math_links = f'''  <link rel="stylesheet" href="{katex_css}">
+  <script defer src="{katex_js}"></script>
+  <script defer src="{katex_auto_render}"></script>'''
         
         math_script = f'''
   <script>
@@ -36,20 +64,35 @@ def generate_html_head(title: str, css_files: List[str] = None, include_math: bo
     }});
   </script>'''
     
-    return f"""<!doctype html>
-<html lang="en">
-<head>
-  <meta charset="utf-8"/>
-  <meta name="viewport" content="width=device-width,initial-scale=1"/>
-  <title>{title}</title>
+    return f"""</title>
 {css_links}{math_links}{math_script}
 </head>"""
 
 
-def generate_navigation(current_page: str = "about", base_path: str = "") -> str:
-    """Generate navigation menu."""
+def generate_html_head(title: str, css_files: List[str] = None, include_math: bool = False, base_path: str = "",
+                       page_class: str = "") -> str:
+    """Generate HTML head section.
+
+    page_class is the page's body class; it picks the per-page CSS bundle.
+    """
+    if css_files is None:
+        css_files = CSS_FILES
+    # Resolved per call: they change when vendor/katex/ appears, which the asset map doesn't reflect
+    math_urls = katex_urls(base_path) if include_math else None
+    return "".join((HEAD_OPEN, title, _html_head_tail(get_asset_map(), tuple(css_files), math_urls, base_path,
+                                                      page_class)))
+
+
+def contains_math(texts) -> bool:
+    """Whether any of the given strings has math for KaTeX to render."""
+    return any(isinstance(text, str) and MATH_PATTERN.search(text) for text in texts)
+
+
+@lru_cache(maxsize=64)
+def _navigation(settings, current_page: str, base_path: str) -> str:
+    """Render the navigation menu for one page kind and base path."""
     nav_items = []
-    for item in NAV_ITEMS:
+    for item in settings.NAV_ITEMS:
         current_class = " current" if item["name"].lower() == current_page else ""
         # Adjust URLs based on base_path
         if base_path and not item["url"].startswith("http"):
@@ -66,7 +109,7 @@ def generate_navigation(current_page: str = "about", base_path: str = "") -> str
     
     return f"""  <header class="site-header">
     <div class="container">
-      <a class="brand" href="{brand_link}">{NAV_BRAND}</a>
+      <a class="brand" href="{brand_link}">{settings.NAV_BRAND}</a>
       <nav class="main-nav">
         <ul class="nav-list">
           {''.join(nav_items)}
@@ -77,6 +120,53 @@ def generate_navigation(current_page: str = "about", base_path: str = "") -> str
   </header>"""
 
 
+def generate_navigation(current_page: str = "about", base_path: str = "") -> str:
+    """Generate navigation menu."""
+    return _navigation(get_settings(), current_page, base_path)
+
+
+@lru_cache(maxsize=64)
+def _page_open(settings, assets, title: str, current_page: str, base_path: str, body_class: str,
+               math_urls: Optional[Tuple[str, str, str]]) -> str:
+    """Render a page from the doctype down to the opening of <main>.
+
+    assets is only part of the cache key: the head links fingerprinted files.
+    """
+    body_attr = f' class="{body_class}"' if body_class else ""
+    head = "".join((HEAD_OPEN, title, _html_head_tail(assets, tuple(CSS_FILES), math_urls, base_path, body_class)))
+    return f"""{head}
+<body{body_attr}>
+{_navigation(settings, current_page, base_path)}
+
+  <main class="container">"""
+
+
+def generate_page_open(title: str, current_page: str, base_path: str = "", body_class: str = "",
+                       include_math: bool = False) -> str:
+    """Generate everything up to and including the opening <main> tag.
+
+    include_math loads KaTeX; pass contains_math(...) of the page's content.
+    """
+    math_urls = katex_urls(base_path) if include_math else None
+    return _page_open(get_settings(), get_asset_map(), title, current_page, base_path, body_class, math_urls)
+
+
+@lru_cache(maxsize=16)
+def _page_close(settings, scripts: Tuple[str, ...], footer: bool) -> str:
+    """Render a page from the closing </main> to the end of the document."""
+    footer_html = f"\n{_contact_footer(settings)}\n" if footer else ""
+    return f"""
+  </main>
+{footer_html}{chr(10).join(scripts)}
+</body>
+</html>"""
+
+
+def generate_page_close(scripts: Tuple[str, ...] = (NAV_SCRIPT,), footer: bool = False) -> str:
+    """Generate the closing </main>, optional contact footer, scripts and document end."""
+    return _page_close(get_settings(), scripts, footer)
+
+
 def generate_hero(title: str, subtitle: str) -> str:
     """Generate hero section."""
     return f"""  <div class="hero">
@@ -87,52 +177,59 @@ def generate_hero(title: str, subtitle: str) -> str:
   </div>"""
 
 
-def generate_contact_sidebar() -> str:
-    """Generate contact information sidebar."""
-    department_html = f'<p><strong>Department:</strong><br>{SITE_DEPARTMENT}</p>' if SITE_DEPARTMENT else ''
+@lru_cache(maxsize=8)
+def _contact_sidebar(settings) -> str:
+    """Render the contact sidebar for a settings object."""
+    department_html = f'<p><strong>Department:</strong><br>{settings.SITE_DEPARTMENT}</p>' if settings.SITE_DEPARTMENT else ''
     return f"""      <div class="sidebar">
         <h3>Contact</h3>
         <div class="contact-info-sidebar">
-          <p><strong>Email:</strong><br>{SITE_EMAIL}</p>
-          <p><strong>Institution:</strong><br>{SITE_INSTITUTION}</p>
+          <p><strong>Email:</strong><br>{settings.SITE_EMAIL}</p>
+          <p><strong>Institution:</strong><br>{settings.SITE_INSTITUTION}</p>
           {department_html}
-          <p><strong>Location:</strong><br>{SITE_LOCATION}</p>
+          <p><strong>Location:</strong><br>{settings.SITE_LOCATION}</p>
         </div>
       </div>"""
 
 
-def generate_contact_footer() -> str:
-    """Generate contact information footer."""
+def generate_contact_sidebar() -> str:
+    """Generate contact information sidebar."""
+    return _contact_sidebar(get_settings())
+
+
+@lru_cache(maxsize=8)
+def _contact_footer(settings) -> str:
+    """Render the contact footer for a settings object."""
     department_html = f"""        <div class="contact-item">
-          <strong>Department:</strong><br>{SITE_DEPARTMENT}
-        </div>""" if SITE_DEPARTMENT else ''
+          <strong>Department:</strong><br>{settings.SITE_DEPARTMENT}
+        </div>""" if settings.SITE_DEPARTMENT else ''
     return f"""  <footer class="contact-footer">
     <div class="container">
       <h3>Contact</h3>
       <div class="contact-info-footer">
         <div class="contact-item">
-          <strong>Email:</strong><br>{SITE_EMAIL}
+          <strong>Email:</strong><br>{settings.SITE_EMAIL}
         </div>
         <div class="contact-item">
-          <strong>Institution:</strong><br>{SITE_INSTITUTION}
+          <strong>Institution:</strong><br>{settings.SITE_INSTITUTION}
         </div>
         {department_html}
         <div class="contact-item">
-          <strong>Location:</strong><br>{SITE_LOCATION}
+          <strong>Location:</strong><br>{settings.SITE_LOCATION}
         </div>
       </div>
     </div>
   </footer>"""
 
 
+def generate_contact_footer() -> str:
+    """Generate contact information footer."""
+    return _contact_footer(get_settings())
+
+
 def generate_nav_script() -> str:
     """Generate navigation toggle script."""
-    return """  <script>
-    function toggleNav() {
-      const nav = document.querySelector('.main-nav');
-      nav.classList.toggle('show');
-    }
-  </script>"""
+    return NAV_SCRIPT
 
 
 def generate_post_item(post: Dict[str, Any], base_path: str = "") -> str:
@@ -183,21 +280,19 @@ def generate_publication_item(pub: Dict[str, Any], base_path: str = "") -> str:
         links_html += f'<a href="{code}" class="pub-link code-link" target="_blank">Code</a>'
     
     # Check for PDF
-    pub_dir = Path("publications/data")
-    meta_files = list(pub_dir.glob("*.meta.json"))
+    assets = get_asset_index()
+    pdf_names = [f"{pub.get('filename', 'itp25')}.pdf", "itp25.pdf"]
     pdf_found = False
     
-    for pdf_name in [f"{pub.get('filename', 'itp25')}.pdf", "itp25.pdf"]:
-        pdf_path = Path("posts") / pdf_name
-        if pdf_path.exists():
+    for pdf_name in pdf_names:
+        if assets.exists(Path("posts") / pdf_name):
             links_html += f'<a href="../posts/{pdf_name}" class="pub-link pdf-link" target="_blank">PDF</a>'
             pdf_found = True
             break
     
     if not pdf_found:
-        for pdf_name in [f"{pub.get('filename', 'itp25')}.pdf", "itp25.pdf"]:
-            pdf_path = Path("Notes/publication") / pdf_name
-            if pdf_path.exists():
+        for pdf_name in pdf_names:
+            if assets.exists(Path("Notes/publication") / pdf_name):
                 links_html += f'<a href="../Notes/publication/{pdf_name}" class="pub-link pdf-link" target="_blank">PDF</a>'
                 pdf_found = True
                 break
@@ -268,18 +363,68 @@ def generate_talk_item(talk: Dict[str, Any], base_path: str = "") -> str:
         </li>"""
 
 
-def generate_tag_filters(posts: List[Dict[str, Any]]) -> str:
-    """Generate tag filter buttons."""
-    all_tags = set()
-    for post in posts:
-        all_tags.update(post["tags"])
-    all_tags = sorted(list(all_tags))
-    
-    tag_buttons = ['<button class="tag-filter active" data-tag="all">All</button>']
-    for tag in all_tags:
-        tag_buttons.append(f'<button class="tag-filter" data-tag="{tag}">{tag.title()}</button>')
-    
-    return f"""    <div class="filter-section">
+def tag_slug(tag: str) -> str:
+    """URL-safe directory name for a tag's listing pages."""
+    return re.sub(r"[^a-z0-9]+", "-", tag.lower()).strip("-") or "tag"
+
+
+def tag_slugs(tags: Iterable[str]) -> Dict[str, str]:
+    """Listing directory names for a set of tags, with colliding slugs made unique."""
+    groups = {}
+    for tag in sorted(set(tags)):
+        groups.setdefault(tag_slug(tag), []).append(tag)
+    slugs = {}
+    for slug, group in groups.items():
+        for tag in group:
+            # "C" and "C++", or "Type Theory" and "type-theory", would share a directory;
+            # keep the bare slug for a tag already written that way and suffix a short hash otherwise
+            if len(group) == 1 or tag == slug:
+                slugs[tag] = slug
+            else:
+                slugs[tag] = f"{slug}-{hashlib.sha1(tag.encode('utf-8')).hexdigest()[:6]}"
+    return slugs
+
+
+def post_tag_slugs(posts: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Listing directory names for every tag used by the given posts."""
+    return tag_slugs(tag for post in posts for tag in post["tags"])
+
+
+def blog_listing_path(tag: str = None, page: int = 1, slugs: Dict[str, str] = None) -> str:
+    """Path of a blog listing page relative to posts/, using slugs (from post_tag_slugs) for tags."""
+    path = f"tags/{(slugs or {}).get(tag) or tag_slug(tag)}/" if tag else ""
+    if page > 1:
+        path += f"page/{page}/"
+    return path + "index.html"
+
+
+class TagFilters:
+    """Tag filter links for the blog listings, rendered once per relative path to posts/."""
+
+    def __init__(self, posts: List[Dict[str, Any]]):
+        self.slugs = post_tag_slugs(posts)
+        self.tags = sorted(self.slugs)
+        # posts_path -> each tag's filter link, in display order
+        self._buttons: Dict[str, Dict[str, str]] = {}
+
+    def _render_buttons(self, posts_path: str) -> Dict[str, str]:
+        """Every tag's filter link for a page at posts_path, none marked active."""
+        return {tag: f'<a class="tag-filter" data-tag="{tag}" '
+                     f'href="{posts_path}{blog_listing_path(tag, 1, self.slugs)}">{tag.title()}</a>'
+                for tag in self.tags}
+
+    def render(self, posts_path: str = "", active_tag: str = None) -> str:
+        """Generate tag filter links to the per-tag listing pages."""
+        buttons = self._buttons.get(posts_path)
+        if buttons is None:
+            buttons = self._buttons[posts_path] = self._render_buttons(posts_path)
+        active_all = " active" if active_tag is None else ""
+        tag_buttons = [f'<a class="tag-filter{active_all}" data-tag="all" href="{posts_path}index.html">All</a>']
+        if active_tag in buttons:
+            buttons = {**buttons, active_tag: buttons[active_tag].replace('"tag-filter"', '"tag-filter active"', 1)}
+        tag_buttons.extend(buttons.values())
+
+        return f"""    <div class="filter-section">
       <h3>Filter by Tag</h3>
       <div class="tag-filters">
         {''.join(tag_buttons)}
@@ -287,32 +432,185 @@ def generate_tag_filters(posts: List[Dict[str, Any]]) -> str:
     </div>"""
 
 
-def generate_tag_filter_script() -> str:
-    """Generate JavaScript for tag filtering."""
-    return """  <script>
+def generate_tag_filters(posts: List[Dict[str, Any]], posts_path: str = "", active_tag: str = None) -> str:
+    """Generate tag filter links to the per-tag listing pages."""
+    return TagFilters(posts).render(posts_path, active_tag)
+
+
+def post_element_id(post: Dict[str, Any]) -> str:
+    """DOM id of a post's entry in a blog listing."""
+    return f"post-{post['slug']}"
+
+
+def generate_tag_index(posts: List[Dict[str, Any]]) -> str:
+    """Generate the inline tag -> post element id index used by the tag filter."""
+    index = {}
+    for post in posts:
+        for tag in post["tags"]:
+            index.setdefault(tag, []).append(post_element_id(post))
+    # Escape "</" so tag names can't terminate the script element early
+    index_json = json.dumps(index, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
+    return f"""
+  <script type="application/json" id="tag-index">{index_json}</script>"""
+
+
+def generate_pagination(tag: str, page: int, page_count: int, posts_path: str,
+                        slugs: Dict[str, str] = None) -> str:
+    """Generate newer/older links between the pages of a blog listing."""
+    if page_count <= 1:
+        return ""
+    newer = f'<a href="{posts_path}{blog_listing_path(tag, page - 1, slugs)}" class="pagination-link">← Newer</a>' if page > 1 else '<span></span>'
+    older = f'<a href="{posts_path}{blog_listing_path(tag, page + 1, slugs)}" class="pagination-link">Older →</a>' if page < page_count else '<span></span>'
+    return f"""
+    <nav class="pagination">
+      {newer}
+      <span class="pagination-status">Page {page} of {page_count}</span>
+      {older}
+    </nav>"""
+
+
+TAG_FILTER_SCRIPT = """  <script>
     // Tag filtering functionality
+    // Filters in place when the page lists every post; otherwise the filter
+    // links lead to the pre-generated per-tag pages. Membership comes from the
+    // precomputed tag index, so a click only touches posts whose visibility changes.
     document.addEventListener('DOMContentLoaded', function() {
+      const postList = document.querySelector('.post-list');
+      const indexScript = document.getElementById('tag-index');
+      if (!postList || !postList.hasAttribute('data-complete') || !indexScript) {
+        return;
+      }
+      const tagIndex = JSON.parse(indexScript.textContent);
       const filterButtons = document.querySelectorAll('.tag-filter');
-      const postItems = document.querySelectorAll('.post-list li');
+      const allIds = Array.from(postList.children, item => item.id);
+      let visible = new Set(allIds);
       
       filterButtons.forEach(button => {
-        button.addEventListener('click', function() {
+        button.addEventListener('click', function(event) {
+          event.preventDefault();
           const selectedTag = this.getAttribute('data-tag');
           
           // Update active button
           filterButtons.forEach(btn => btn.classList.remove('active'));
           this.classList.add('active');
           
-          // Filter posts
-          postItems.forEach(item => {
-            const itemTags = item.getAttribute('data-tags');
-            if (selectedTag === 'all' || (itemTags && itemTags.trim() !== '' && itemTags.includes(selectedTag))) {
-              item.classList.remove('hidden');
-            } else {
-              item.classList.add('hidden');
+          // Show/hide only the posts entering or leaving the selection
+          const selected = new Set(selectedTag === 'all' ? allIds : (tagIndex[selectedTag] || []));
+          visible.forEach(id => {
+            if (!selected.has(id)) {
+              document.getElementById(id).classList.add('hidden');
+            }
+          });
+          selected.forEach(id => {
+            if (!visible.has(id)) {
+              document.getElementById(id).classList.remove('hidden');
             }
           });
+          visible = selected;
         });
       });
     });
   </script>"""
+
+
+def generate_tag_filter_script() -> str:
+    """Generate JavaScript for tag filtering."""
+    return TAG_FILTER_SCRIPT
+
+
+@lru_cache(maxsize=1)
+def generate_search_script() -> str:
+    """Generate JavaScript that queries the sharded search index."""
+    from .search_index import MIN_TERM_LENGTH, SHARD_PREFIX_LENGTH, STOP_WORDS
+    stop_words = json.dumps(sorted(STOP_WORDS))
+    return f"""  <script>
+    // Full-text search over the build-time index: only the shards for the
+    // query's term prefixes are fetched
+    document.addEventListener('DOMContentLoaded', function() {{
+      const form = document.querySelector('.search-form');
+      const input = form.querySelector('input[name="q"]');
+      const status = document.querySelector('.search-status');
+      const results = document.querySelector('.search-results');
+      const stopWords = new Set({stop_words});
+      const cache = new Map();
+      
+      function fetchJSON(url) {{
+        if (!cache.has(url)) {{
+          cache.set(url, fetch(url).then(response => response.ok ? response.json() : {{}}));
+        }}
+        return cache.get(url);
+      }}
+      
+      function tokenize(text) {{
+        return (text.toLowerCase().match(/[\\p{{L}}\\p{{N}}_]+/gu) || [])
+          .filter(term => term.length >= {MIN_TERM_LENGTH} && !stopWords.has(term));
+      }}
+      
+      async function search(query) {{
+        const terms = tokenize(query);
+        results.replaceChildren();
+        if (terms.length === 0) {{
+          status.textContent = '';
+          return;
+        }}
+        const docs = await fetchJSON('docs.json');
+        let scores = null;
+        for (const term of terms) {{
+          // Prefix match within the term's shard, so partial words find results
+          const shard = await fetchJSON('shards/' + encodeURIComponent(term.slice(0, {SHARD_PREFIX_LENGTH})) + '.json');
+          const termScores = new Map();
+          for (const [key, postings] of Object.entries(shard)) {{
+            if (key.startsWith(term)) {{
+              postings.forEach(([doc, count]) => termScores.set(doc, (termScores.get(doc) || 0) + count));
+            }}
+          }}
+          if (scores === null) {{
+            scores = termScores;
+          }} else {{
+            for (const doc of Array.from(scores.keys())) {{
+              if (termScores.has(doc)) {{
+                scores.set(doc, scores.get(doc) + termScores.get(doc));
+              }} else {{
+                scores.delete(doc);
+              }}
+            }}
+          }}
+        }}
+        const ranked = Array.from(scores.entries()).sort((a, b) => b[1] - a[1]);
+        status.textContent = ranked.length + (ranked.length === 1 ? ' result' : ' results');
+        ranked.forEach(([doc]) => {{
+          const item = document.createElement('li');
+          item.className = 'search-result';
+          const link = document.createElement('a');
+          link.href = '../' + docs[doc].u;
+          link.textContent = docs[doc].t;
+          const kind = document.createElement('span');
+          kind.className = 'search-kind';
+          kind.textContent = docs[doc].k;
+          item.append(link, ' ', kind);
+          results.appendChild(item);
+        }});
+      }}
+      
+      form.addEventListener('submit', function(event) {{
+        event.preventDefault();
+        history.replaceState(null, '', '?q=' + encodeURIComponent(input.value));
+        search(input.value);
+      }});
+      
+      const initial = new URLSearchParams(window.location.search).get('q');
+      if (initial) {{
+        input.value = initial;
+        search(initial);
+      }}
+    }});
+  </script>"""
+
+
+def generate_search_form(action: str) -> str:
+    """Generate a search box that submits to the search page."""
+    return f"""
+    <form class="search-form" action="{action}" method="get" role="search">
+      <input type="search" name="q" placeholder="Search posts, publications and notes" aria-label="Search">
+      <button type="submit">Search</button>
+    </form>"""
@@ -0,0 +1,120 @@
+"""
+Watch mode: rebuild what an edit affects and serve the result.
+
+Source files are polled (no extra dependencies). When something changes:
+
+- edited posts/*.tex files, and posts whose posts/<slug>.meta.json changed, are
+  rebuilt with build_posts (one pandoc run each, or a cache hit);
+- a change to the post template, a CSS edit that renames the post
+  stylesheet (fingerprinting or bundling on), or an image edit with
+  responsive images on, rebuilds every post;
+- the site pages are then regenerated through the build manifest, so only
+  pages whose inputs changed are re-rendered.
+"""
+import glob
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+from .asset_index import build_asset_index
+from .asset_pipeline import stylesheet_url
+from .config import IMAGES_DIR, POSTS_SRC, get_settings
+from .build_posts import POST_TEMPLATE, build_posts, split_post_name
+from .dev_server import DEFAULT_PORT, start_server
+
+WATCH_PATTERNS = [
+    "posts/*.tex",
+    "posts/*.meta.json",
+    "publications/data/*.meta.json",
+    "css/*",
+    "templates/*",
+    "*.meta.json",
+    "about.md",
+    "images/*",
+    "vendor/katex/katex.min.js",
+]
+
+POLL_INTERVAL = 0.5
+# Editors often save in several steps; wait for the tree to settle before building
+SETTLE_DELAY = 0.2
+
+Snapshot = Dict[str, Tuple[int, int]]
+
+
+def snapshot(patterns: Iterable[str] = WATCH_PATTERNS) -> Snapshot:
+    """Map every watched file to its (mtime_ns, size)."""
+    files = {}
+    for pattern in patterns:
+        for name in glob.glob(pattern):
+            try:
+                st = os.stat(name)
+            except FileNotFoundError:
+                continue
+            files[Path(name).as_posix()] = (st.st_mtime_ns, st.st_size)
+    return files
+
+
+def changed_paths(old: Snapshot, new: Snapshot) -> Set[str]:
+    """Files added, removed or modified between two snapshots."""
+    return {path for path in old.keys() | new.keys() if old.get(path) != new.get(path)}
+
+
+def posts_to_rebuild(changed: Set[str]) -> List[Path]:
+    """TeX sources whose converted HTML is out of date after a change."""
+    tex_files = sorted(POSTS_SRC.glob("*.tex"))
+    if POST_TEMPLATE.as_posix() in changed:
+        return tex_files
+    # Responsive <img> tags carry the image's size and variants; relink them (cache hits)
+    if get_settings().BUILD_RESPONSIVE_IMAGES and any(Path(path).parent == IMAGES_DIR for path in changed):
+        return tex_files
+    changed_slugs = {Path(path).name[:-len(".meta.json")] for path in changed
+                     if Path(path).parent == POSTS_SRC and path.endswith(".meta.json")}
+    rebuild = []
+    for tex in tex_files:
+        names = split_post_name(tex)
+        if tex.as_posix() in changed or (names and names[2] in changed_slugs):
+            rebuild.append(tex)
+    return rebuild
+
+
+def watch(build_site: Callable[[], None], port: int = DEFAULT_PORT) -> None:
+    """Serve the site and rebuild it on every change until interrupted."""
+    server = start_server(port)
+    print(f"🌐 Serving the site at http://127.0.0.1:{port}/")
+    print(f"👀 Watching {', '.join(WATCH_PATTERNS)} (Ctrl+C to stop)")
+    files = snapshot()
+    try:
+        while True:
+            time.sleep(POLL_INTERVAL)
+            current = snapshot()
+            if current == files:
+                continue
+            time.sleep(SETTLE_DELAY)
+            current = snapshot()
+            changed = changed_paths(files, current)
+            files = current
+
+            print(f"\n🔄 Changed: {', '.join(sorted(changed))}")
+            started = time.perf_counter()
+            try:
+                tex_files = posts_to_rebuild(changed)
+                if tex_files:
+                    # Posts read their metadata through the index; pick up new meta.json files
+                    build_asset_index()
+                    build_posts(tex_files)
+                stylesheet = stylesheet_url("post-page", "../../")
+                build_site()
+                # A CSS edit renames fingerprinted stylesheets and bundles; relink every post
+                if stylesheet_url("post-page", "../../") != stylesheet:
+                    build_posts(sorted(POSTS_SRC.glob("*.tex")))
+            except Exception as e:
+                # Keep watching; the next save usually fixes the error
+                print(f"✗ Rebuild failed: {e}")
+                continue
+            print(f"⏱ Rebuilt in {time.perf_counter() - started:.2f}s")
+            # Post HTML written by the rebuild must not trigger another one
+            files = snapshot()
+    except KeyboardInterrupt:
+        print("\n👋 Stopping watch mode")
+    finally:
+        server.shutdown()
@@ -0,0 +1,61 @@
+"""Tests for fingerprinted assets and their precompressed sidecars."""
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add the repository root to the path so we can import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from script.asset_pipeline import build_assets
+from script.config import SITE_METADATA_FILE
+from script.precompress import precompress_outputs
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+class PrecompressedAssetsTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        site_metadata = json.loads((REPO_ROOT / SITE_METADATA_FILE).read_text(encoding="utf-8"))
+        site_metadata["build"] = {"fingerprint_assets": True, "precompress": True}
+        SITE_METADATA_FILE.write_text(json.dumps(site_metadata), encoding="utf-8")
+        Path("css").mkdir()
+        Path("css/main.css").write_text("@import 'base.css';\n" + "body { color: #333; }\n" * 50,
+                                        encoding="utf-8")
+        Path("css/base.css").write_text("p { margin: 0; }\n" * 50, encoding="utf-8")
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def build(self) -> int:
+        """One asset build followed by precompression; returns how many files were compressed."""
+        assets = build_assets()
+        self.assets = sorted(assets.mapping.values())
+        return precompress_outputs()
+
+    def test_second_build_keeps_sidecars(self):
+        self.assertGreater(self.build(), 0)
+        self.assertEqual(self.build(), 0)
+        for asset in self.assets:
+            self.assertTrue(Path(asset + ".gz").is_file(), asset)
+
+    def test_sidecars_of_stale_assets_are_removed(self):
+        self.build()
+        old_assets = self.assets
+        Path("css/base.css").write_text("p { margin: 1em; }\n" * 50, encoding="utf-8")
+        self.build()
+        for asset in set(old_assets) - set(self.assets):
+            self.assertFalse(Path(asset).exists(), asset)
+            self.assertFalse(Path(asset + ".gz").exists(), asset)
+        for asset in self.assets:
+            self.assertTrue(Path(asset + ".gz").is_file(), asset)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""Tests for the post pipeline's use of the pandoc cache."""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add the repository root to the path so we can import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from script import build_posts, pandoc_cache
+from script.config import SITE_METADATA_FILE
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def fake_convert_post(tex_path, slug, meta_args, html_args, content_md, index_html, static_math=False,
+                      katex_args=None):
+    """Stand-in for the two pandoc runs."""
+    content_md.write_text(f"Converted {tex_path.name}\n", encoding="utf-8")
+    index_html.write_text(f"<html><body><p>{slug}</p></body></html>\n", encoding="utf-8")
+
+
+class CacheHitTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        shutil.copyfile(REPO_ROOT / SITE_METADATA_FILE, SITE_METADATA_FILE)
+        Path("posts").mkdir()
+        self.tex = Path("posts/2025-01-01-hello.tex")
+        self.tex.write_text("\\documentclass{article}\n", encoding="utf-8")
+        self.outdir = Path("posts/hello")
+        self.outdir.mkdir()
+        patches = [
+            mock.patch.object(pandoc_cache, "pandoc_version", return_value="pandoc 0.0"),
+            mock.patch.object(build_posts, "convert_post", side_effect=fake_convert_post),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def build(self):
+        return build_posts.build_post_html(self.tex, "2025-01-01", "hello", self.outdir)
+
+    def test_cache_hit_leaves_outputs_untouched(self):
+        _, cached = self.build()
+        self.assertFalse(cached)
+        outputs = [self.outdir / "content.md", self.outdir / "index.html"]
+        # Backdate the outputs so any rewrite would show up in their mtime
+        for path in outputs:
+            os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+
+        _, cached = self.build()
+        self.assertTrue(cached)
+        self.assertEqual(build_posts.convert_post.call_count, 1)
+        for path in outputs:
+            self.assertEqual(path.stat().st_mtime_ns, 1_000_000_000, path)
+
+    def test_cache_hit_restores_changed_outputs(self):
+        self.build()
+        (self.outdir / "index.html").write_text("stale\n", encoding="utf-8")
+        _, cached = self.build()
+        self.assertTrue(cached)
+        self.assertEqual((self.outdir / "index.html").read_text(encoding="utf-8"),
+                         "<html><body><p>hello</p></body></html>\n")
+
+
+if __name__ == "__main__":
+    unittest.main()